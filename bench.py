@@ -0,0 +1,266 @@
+"""
+Offline benchmark for Gesture Control.
+
+Replays landmark recordings and/or video files headlessly (see
+replay.py) and reports per-stage latency percentiles, frames/sec and
+the actions that would have been sent to the OS. Needs no camera, GPU
+or desktop, so it runs on a CI box.
+
+    python bench.py session.npy clip.mp4 --repeat 3 --json new.json
+    python bench.py session.npy --baseline old.json
+    python bench.py session.npy --filters      # cursor filter lag/jitter
+    python bench.py clip.mp4 --capture 300     # old vs zero-copy frame path
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+import virtualmouse as vm
+from camera import Camera, RgbBuffer, driver_time, open_capture
+from filters import FILTERS, evaluate, make_filter
+from inference import HandInference
+from inference import format_stats as format_infer_stats
+from landmarks import finger_states, mirror
+from recording import load_recording
+from replay import replay
+
+PCTS = (50, 95, 99)
+
+
+def summarize(result):
+    stages = {}
+    for name, samples in result.timings.items():
+        ms = np.asarray(samples) * 1000.0
+        stages[name] = {f"p{q}": float(np.percentile(ms, q)) for q in PCTS}
+        stages[name]["mean"] = float(ms.mean())
+    return {"frames":  result.frames,
+            "fps":     result.fps,
+            "stages":  stages,
+            "actions": dict(sorted(result.actions.items())),
+            "infer":   result.infer}
+
+
+def run(sources, repeat=1, **replay_kw):
+    """{source: summary}, keeping the fastest of `repeat` runs."""
+    report = {}
+    for src in sources:
+        best = None
+        for _ in range(repeat):
+            s = summarize(replay(src, **replay_kw))
+            if best is None or s["fps"] > best["fps"]:
+                best = s
+        report[src] = best
+    return report
+
+
+def cursor_trace(path):
+    """(t, xy) screen-space cursor targets from a recording, for frames
+    where the cursor follows the hand (hand present, thumb open)."""
+    rec = load_recording(path)
+    rec = rec[rec["present"] == 1]
+    rec = rec[finger_states(rec["lm"])[:, 0]]
+    tr  = vm.tracker
+    xy  = [tr.cursor_target(r["lm"], int(r["w"]), int(r["h"]),
+                            *tr.roi_box(int(r["w"]), int(r["h"])))
+           for r in rec]
+    return np.asarray(rec["t"]), np.asarray(xy).reshape(-1, 2)
+
+
+def evaluate_filters(path):
+    """{filter: evaluate() result} on one recording, default parameters."""
+    t, xy = cursor_trace(path)
+    if len(t) < 10:
+        return {}
+    return {name: evaluate(make_filter(name), t, xy) for name in FILTERS}
+
+
+def print_filters(path, scores):
+    print(f"\n{path} — cursor filters")
+    if not scores:
+        print("  too few cursor frames to evaluate")
+        return
+    print(f"  {'filter':<8}{'lag ms':>10}{'jitter px':>12}   (raw jitter "
+          f"{next(iter(scores.values()))['raw_jitter']:.2f} px)")
+    for name, s in scores.items():
+        print(f"  {name:<8}{s['lag_ms']:>10.1f}{s['jitter_px']:>12.2f}")
+
+
+def _old_path(source, inference):
+    """(cap, step) reading frames as the loop did before camera.py:
+    read, flip and convert, each into a new array."""
+    cap, live = open_capture(source)
+
+    def step():
+        ok, raw = cap.read()
+        if not ok:
+            return None
+        t_cap   = time.perf_counter()
+        t_cap   = (live and driver_time(cap, t_cap)) or t_cap
+        flipped = cv2.flip(raw, 1)
+        rgb     = cv2.cvtColor(flipped, cv2.COLOR_BGR2RGB)
+        return t_cap, flipped, inference.process(rgb)
+    return cap, step
+
+
+def _new_path(source, inference):
+    """(cap, step) through Camera and RgbBuffer, mirroring landmarks instead of pixels."""
+    cap, to_rgb = Camera(source), RgbBuffer()
+    last = None
+
+    def step():
+        nonlocal last
+        cap.release_frame(last)          # the caller is done with the previous one
+        ok, frame = cap.read()
+        last = frame
+        if not ok:
+            return None
+        pts = inference.process(to_rgb(frame))
+        if pts is not None:
+            mirror(pts)
+        return cap.t_frame, frame, pts
+    return cap, step
+
+
+def capture_paths(source, frames):
+    """
+    {path: {"alloc_kb", "buffers", "p50_ms", "p95_ms"}} for the old and
+    the zero-copy frame path over the first `frames` frames of a video
+    file or camera. alloc_kb is what NumPy/OpenCV allocated per frame
+    (tracemalloc peak while the frame is processed), buffers the same
+    in full-frame buffers; p50/p95 are capture → landmarks. Allocations
+    are measured in a second pass so tracing does not skew latency.
+    """
+    out = {}
+    for name, path in (("old", _old_path), ("zero-copy", _new_path)):
+        hands = vm.make_hands()
+        inference = HandInference(hands)
+        lat, alloc, size = [], [], 1
+        cap, step = path(source, inference)
+        try:
+            for _ in range(frames):
+                item = step()
+                if item is None:
+                    break
+                lat.append(time.perf_counter() - item[0])
+        finally:
+            cap.release()
+
+        cap, step = path(source, inference)
+        tracemalloc.start()
+        try:
+            for _ in range(frames):
+                item = None                  # last frame released before measuring
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                item = step()
+                if item is None:
+                    break
+                alloc.append(tracemalloc.get_traced_memory()[1] - base)
+                size = item[1].nbytes
+        finally:
+            tracemalloc.stop()
+            cap.release()
+            hands.close()
+        ms = np.asarray(lat) * 1000.0
+        # the first frames allocate the reused buffers; report steady state
+        steady = float(np.mean(alloc[5:] or alloc))
+        out[name] = {"frames": len(lat), "alloc_kb": steady / 1024,
+                     "buffers": steady / size,
+                     "p50_ms": float(np.percentile(ms, 50)),
+                     "p95_ms": float(np.percentile(ms, 95))}
+    return out
+
+
+def print_capture(source, rows):
+    print(f"\n{source} — frame path ({next(iter(rows.values()))['frames']} frames)")
+    print(f"  {'path':<11}{'KB/frame':>10}{'buffers':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for name, r in rows.items():
+        print(f"  {name:<11}{r['alloc_kb']:>10.1f}{r['buffers']:>9.2f}"
+              f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}")
+
+
+def _delta(new, old):
+    if not old:
+        return ""
+    return f" ({(new - old) / old * 100:+.0f}%)"
+
+
+def print_report(report, baseline=None):
+    baseline = baseline or {}
+    for src, s in report.items():
+        base = baseline.get(src, {})
+        print(f"\n{src}")
+        print(f"  {s['frames']} frames  {s['fps']:.1f} fps"
+              f"{_delta(s['fps'], base.get('fps'))}")
+        print(f"  {'stage':<8}" + "".join(f"{'p' + str(q):>10}" for q in PCTS)
+              + f"{'mean':>10}   (ms)")
+        for name, st in s["stages"].items():
+            bst = base.get("stages", {}).get(name, {})
+            row = "".join(f"{st[f'p{q}']:>10.3f}" for q in PCTS)
+            print(f"  {name:<8}{row}{st['mean']:>10.3f}"
+                  f"{_delta(st['p50'], bst.get('p50'))}")
+        if s["infer"]:
+            print("  " + format_infer_stats(s["infer"]))
+        if s["actions"]:
+            print("  actions: " + "  ".join(f"{k}={v}" for k, v in s["actions"].items()))
+        if base and base.get("actions") != s["actions"]:
+            print(f"  ! actions differ from baseline: {base.get('actions')}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless Gesture Control benchmark.")
+    ap.add_argument("sources", nargs="+", help="landmark recordings (.npy) or video files")
+    ap.add_argument("--repeat", type=int, default=1, help="runs per source, best kept")
+    ap.add_argument("--crop", action="store_true", help="crop inference for video sources")
+    ap.add_argument("--target-fps", type=float, metavar="FPS",
+                    help="resolution governor target for video sources")
+    ap.add_argument("--flow", action="store_true",
+                    help="optical flow between sparse inferences for video sources")
+    ap.add_argument("--filters", action="store_true",
+                    help="also score every cursor filter (lag/jitter) on .npy recordings")
+    ap.add_argument("--capture", type=int, metavar="N",
+                    help="instead of replaying, compare the old and zero-copy frame "
+                         "path on N frames of each video file / camera index")
+    ap.add_argument("--json", metavar="PATH", help="write the report as JSON")
+    ap.add_argument("--baseline", metavar="PATH", help="compare against an earlier --json report")
+    args = ap.parse_args(argv)
+
+    if args.capture:
+        report = {}
+        for src in args.sources:
+            report[src] = capture_paths(src, args.capture)
+            print_capture(src, report[src])
+        if args.json:
+            with open(args.json, "w") as fp:
+                json.dump(report, fp, indent=2)
+        return 0
+
+    report = run(args.sources, args.repeat,
+                 crop=args.crop, target_fps=args.target_fps, flow=args.flow)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+    print_report(report, baseline)
+    if args.filters:
+        for src in args.sources:
+            if src.endswith(".npy"):
+                scores = evaluate_filters(src)
+                print_filters(src, scores)
+                report[src]["filters"] = scores
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(report, fp, indent=2)
+    if baseline and any(baseline.get(k, {}).get("actions") not in (None, v["actions"])
+                        for k, v in report.items()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Low-latency capture and reusable frame buffers.
+
+Camera is a drop-in for cv2.VideoCapture (read / grab / retrieve / get /
+set / release / isOpened) tuned for a control loop rather than for
+recording:
+
+  * On a camera device it asks the driver for a single buffer
+    (CAP_PROP_BUFFERSIZE=1), a compressed pixel format (MJPG by
+    default, so high resolutions still reach full frame rate over USB)
+    and, when given, a capture size and frame rate. Backends that
+    ignore a setting simply keep their default.
+  * read() is grab() + retrieve(). When the grabbed frame is clearly
+    older than one frame period a newer one is already waiting, so up
+    to `max_drain` such stale frames are skipped (grabbing without
+    decoding is cheap) and the loop always works on the newest one.
+    "Clearly" leaves room for the driver's delivery delay: uvcvideo,
+    for one, stamps the start of a frame, so even a fresh frame is
+    usually older than a period by the time grab() returns.
+  * retrieve() decodes into a ring of reused buffers instead of a
+    fresh array per frame. Every frame it returns is held until the
+    reader hands it back with release_frame(frame) — after the last
+    stage is done with it, or when a pipeline drops it — and only then
+    is its buffer decoded into again, so frames still in flight are
+    never overwritten. The ring grows to the number of frames in flight
+    and then stays put; a frame never released keeps its buffer.
+  * t_frame is the capture time of the last frame on the
+    time.perf_counter() clock — the driver's buffer timestamp on
+    V4L2, otherwise the time grab() returned.
+
+Video files are read frame by frame: nothing is skipped and no device
+settings are applied.
+
+RgbBuffer converts BGR to RGB into one reused array. Both count the
+buffers they had to allocate (`allocs`): a few at start-up and after a
+resolution change, none per frame.
+"""
+import sys
+import threading
+import time
+
+import cv2
+
+
+def is_camera(source):
+    """"0" / 0 is a camera device, anything else a file."""
+    return isinstance(source, int) or str(source).isdigit()
+
+
+def open_capture(source):
+    """"0" / 0 → camera device (V4L2 on Linux), anything else → file."""
+    if is_camera(source):
+        if sys.platform.startswith("linux"):
+            return cv2.VideoCapture(int(source), cv2.CAP_V4L2), True
+        return cv2.VideoCapture(int(source)), True
+    return cv2.VideoCapture(source), False
+
+
+def driver_time(cap, now):
+    """
+    Capture time of the frame just grabbed from a camera, on the
+    perf_counter() clock, or None. V4L2 reports the buffer's
+    CLOCK_MONOTONIC timestamp, which is what perf_counter() reads on
+    Linux; other backends report 0 or an unrelated clock.
+    """
+    ts = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+    return ts if 0.0 < now - ts < 1.0 else None
+
+
+class Camera:
+    """
+    source     camera index or video path
+    size       (w, h) to request from the camera, None: driver default
+    fps        frame rate to request, None: driver default
+    fourcc     pixel format to request ("MJPG", "YUYV", …), None: driver default
+    ring       frame buffers to start with (more are added while all are in use)
+    max_drain  most stale frames skipped per read
+    drain_ms   without driver timestamps, a grab faster than this returned a queued frame
+    slack      a frame is stale once older than slack × period plus the
+               smallest delivery delay seen so far
+    """
+
+    def __init__(self, source=0, size=None, fps=None, fourcc="MJPG", ring=1,
+                 max_drain=4, drain_ms=2.0, slack=1.5):
+        self.cap, self.live = open_capture(source)
+        self.max_drain = max_drain if self.live else 0
+        self.drain_s   = drain_ms / 1000.0
+        self.slack     = slack
+        self.delay     = None         # smallest stamp → grab() delay seen
+        self.ring      = [None] * max(1, ring)
+        self.held      = [False] * len(self.ring)   # handed out, not released yet
+        self._lock     = threading.Lock()           # release_frame() comes from other threads
+        self._next     = 0
+        self.t_frame   = 0.0
+        self._last     = 0.0          # when the previous grab returned
+        self.frames    = 0
+        self.stale     = 0            # superseded frames skipped
+        self.allocs    = 0            # frame buffers allocated
+        if self.live and self.cap.isOpened():
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            if fourcc:
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+            if size:
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH,  size[0])
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+            if fps:
+                self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.period = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+
+    # ── VideoCapture API ─────────────────────────────────────
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        ok = self.cap.set(prop, value)
+        if prop == cv2.CAP_PROP_FPS:
+            self.period = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+            self.delay  = None
+        return ok
+
+    def release(self):
+        self.cap.release()
+
+    def _stamp(self, now):
+        return driver_time(self.cap, now) if self.live else None
+
+    def _stale(self, ts, t0, t1, away):
+        """Has a newer frame been captured since the one just grabbed?"""
+        if ts is not None:
+            age = t1 - ts
+            if self.delay is None or age < self.delay:
+                self.delay = age
+            return age > self.slack * self.period + self.delay
+        # no timestamp: it was queued (grab returned at once) and we were
+        # away long enough for another frame to have arrived behind it
+        return t1 - t0 < self.drain_s and away > self.period
+
+    def grab(self):
+        """Grab the newest frame, skipping ones a newer frame has superseded."""
+        t0   = time.perf_counter()
+        away = t0 - self._last
+        if not self.cap.grab():
+            return False
+        t1 = time.perf_counter()
+        ts = self._stamp(t1)
+        for _ in range(self.max_drain):
+            if not self._stale(ts, t0, t1, away):
+                break
+            t0, away = t1, away - self.period
+            if not self.cap.grab():
+                return False
+            t1 = time.perf_counter()
+            ts = self._stamp(t1)
+            self.stale += 1
+        self._last   = t1
+        self.t_frame = t1 if ts is None else ts
+        return True
+
+    def _free(self):
+        """Index of the next ring buffer no frame in flight holds, now held."""
+        with self._lock:
+            n = len(self.ring)
+            for k in range(n):
+                i = (self._next + k) % n
+                if not self.held[i]:
+                    break
+            else:
+                self.ring.append(None)
+                self.held.append(False)
+                i = n
+            self._next   = (i + 1) % len(self.ring)
+            self.held[i] = True
+            return i
+
+    def retrieve(self):
+        """Decode the grabbed frame into a free ring buffer, held until release_frame()."""
+        i   = self._free()
+        buf = self.ring[i]
+        ok, frame = self.cap.retrieve(buf)
+        if not ok:
+            self.held[i] = False
+            return False, None
+        if frame is not buf:           # new buffer, or the size changed
+            self.ring[i] = frame
+            self.allocs += 1
+        self.frames += 1
+        return True, frame
+
+    def release_frame(self, frame):
+        """Hand back a frame from read()/retrieve(): its buffer may be reused."""
+        with self._lock:
+            for i, buf in enumerate(self.ring):
+                if buf is frame:
+                    self.held[i] = False
+                    return
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def stats(self):
+        return {"frames": self.frames, "stale": self.stale, "allocs": self.allocs,
+                "buffers": len(self.ring), "held": sum(self.held),
+                "delay_ms": self.delay * 1000.0 if self.delay is not None else 0.0}
+
+
+class RgbBuffer:
+    """BGR → RGB into one reused array (valid until the next call)."""
+
+    def __init__(self):
+        self.buf    = None
+        self.allocs = 0
+
+    def __call__(self, bgr):
+        out = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=self.buf)
+        if out is not self.buf:
+            self.buf = out
+            self.allocs += 1
+        return out
+
+
+def format_stats(s):
+    return (f"camera {s['frames']} frames  {s['stale']} stale skipped  "
+            f"{s['allocs']} buffers allocated ({s['buffers']} in ring)"
+            + (f"  delivery {s['delay_ms']:.0f} ms" if s["delay_ms"] else ""))
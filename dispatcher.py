@@ -0,0 +1,282 @@
+"""
+OS input for Gesture Control.
+
+Gesture code never talks to the OS directly. It calls a small API —
+
+    move(x, y)  click(button, clicks)  scroll(dy, modifiers)
+    hotkey(*keys)  screenshot(path)  size()
+
+— which is implemented by every backend and by InputDispatcher. The
+dispatcher only enqueues an intent and returns; a worker thread feeds
+the backend. While the worker is busy, a new cursor move replaces a
+pending one (only the newest target matters) and scroll deltas with
+the same modifiers are summed into one event. Clicks, hotkeys and
+screenshots are never merged and act as barriers, so a click still
+lands where the cursor was when it was issued.
+
+Backends:
+    PyAutoGuiBackend   portable, pyautogui with its per-call PAUSE off
+    XlibBackend        X11 XTest via python-xlib, no per-call overhead
+    RecordingBackend   records intents, touches nothing (tests/replay)
+"""
+import threading
+from collections import Counter, deque
+
+# ─────────────────────────────────────────────────────────────
+#  Backends
+# ─────────────────────────────────────────────────────────────
+
+class PyAutoGuiBackend:
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        pyautogui.PAUSE    = 0        # default 0.1 s sleep after every call
+        self.pg = pyautogui
+
+    def size(self):
+        return tuple(self.pg.size())
+
+    def move(self, x, y):
+        self.pg.moveTo(x, y)
+
+    def click(self, button="left", clicks=1):
+        self.pg.click(button=button, clicks=clicks)
+
+    def scroll(self, dy, modifiers=()):
+        for k in modifiers:
+            self.pg.keyDown(k)
+        self.pg.scroll(dy)
+        for k in reversed(modifiers):
+            self.pg.keyUp(k)
+
+    def hotkey(self, *keys):
+        self.pg.hotkey(*keys)
+
+    def screenshot(self, path):
+        self.pg.screenshot(path)
+
+
+class XlibBackend:
+    """Synthesises events with the XTest extension (Linux/X11 only)."""
+    name = "xlib"
+
+    BUTTONS = {"left": 1, "middle": 2, "right": 3}
+    KEYSYMS = {"ctrl": "Control_L", "shift": "Shift_L", "alt": "Alt_L"}
+
+    def __init__(self):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self.X, self.XK, self.xtest = X, XK, xtest
+        self.d    = display.Display()
+        self.root = self.d.screen().root
+        if not self.d.has_extension("XTEST"):
+            raise RuntimeError("X server has no XTEST extension")
+
+    def size(self):
+        s = self.d.screen()
+        return s.width_in_pixels, s.height_in_pixels
+
+    def _button(self, b):
+        self.xtest.fake_input(self.d, self.X.ButtonPress, b)
+        self.xtest.fake_input(self.d, self.X.ButtonRelease, b)
+
+    def _keycode(self, key):
+        sym = self.XK.string_to_keysym(self.KEYSYMS.get(key, key))
+        return self.d.keysym_to_keycode(sym)
+
+    def move(self, x, y):
+        self.xtest.fake_input(self.d, self.X.MotionNotify, x=int(x), y=int(y))
+        self.d.flush()
+
+    def click(self, button="left", clicks=1):
+        for _ in range(clicks):
+            self._button(self.BUTTONS[button])
+        self.d.flush()
+
+    def scroll(self, dy, modifiers=()):
+        codes = [self._keycode(k) for k in modifiers]
+        for c in codes:
+            self.xtest.fake_input(self.d, self.X.KeyPress, c)
+        for _ in range(abs(int(dy))):
+            self._button(4 if dy > 0 else 5)
+        for c in reversed(codes):
+            self.xtest.fake_input(self.d, self.X.KeyRelease, c)
+        self.d.flush()
+
+    def hotkey(self, *keys):
+        codes = [self._keycode(k) for k in keys]
+        for c in codes:
+            self.xtest.fake_input(self.d, self.X.KeyPress, c)
+        for c in reversed(codes):
+            self.xtest.fake_input(self.d, self.X.KeyRelease, c)
+        self.d.flush()
+
+    def screenshot(self, path):
+        import pyautogui
+        pyautogui.screenshot(path)
+
+
+class RecordingBackend:
+    """Counts and keeps every intent instead of sending it to the OS."""
+    name = "null"
+
+    def __init__(self, size=(1920, 1080), keep=False):
+        self.screen = size
+        self.calls  = Counter()
+        self.log    = [] if keep else None
+
+    def _rec(self, key, *args):
+        self.calls[key] += 1
+        if self.log is not None:
+            self.log.append((key,) + args)
+
+    def size(self):
+        return self.screen
+
+    def move(self, x, y):
+        self._rec("move", x, y)
+
+    def click(self, button="left", clicks=1):
+        self._rec("double_click" if clicks == 2 else f"click:{button}")
+
+    def scroll(self, dy, modifiers=()):
+        key = "scroll_up" if dy > 0 else "scroll_down"
+        self._rec("+".join(tuple(modifiers) + (key,)), dy)
+
+    def hotkey(self, *keys):
+        self._rec("hotkey:" + "+".join(keys))
+
+    def screenshot(self, path):
+        self._rec("screenshot", path)
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGuiBackend,
+    "xlib":      XlibBackend,
+    "null":      RecordingBackend,
+}
+
+# ─────────────────────────────────────────────────────────────
+#  Dispatcher
+# ─────────────────────────────────────────────────────────────
+
+class InputDispatcher:
+    """
+    Non-blocking front for a backend. Intents go into a bounded queue
+    and a worker thread sends them in order.
+
+    issued     intents handed to the dispatcher
+    coalesced  merged into a pending intent (moves, same-modifier scrolls)
+    dropped    discarded because the queue was full (oldest move/scroll first)
+    sent       backend calls made
+    """
+
+    MERGEABLE = ("move", "scroll")
+
+    def __init__(self, backend, maxlen=32):
+        self.backend   = backend
+        self.maxlen    = maxlen
+        self.issued    = 0
+        self.coalesced = 0
+        self.dropped   = 0
+        self.sent      = 0
+        self.errors    = 0
+        self._q        = deque()
+        self._cond     = threading.Condition()
+        self._closed   = False
+        self._worker   = threading.Thread(target=self._run, name="input", daemon=True)
+        self._worker.start()
+
+    # ── Intent API (same shape as the backends) ──────────────
+
+    def size(self):
+        return self.backend.size()
+
+    def move(self, x, y):
+        self._put("move", (x, y))
+
+    def click(self, button="left", clicks=1):
+        self._put("click", (button, clicks))
+
+    def scroll(self, dy, modifiers=()):
+        self._put("scroll", (dy, tuple(modifiers)))
+
+    def hotkey(self, *keys):
+        self._put("hotkey", keys)
+
+    def screenshot(self, path):
+        self._put("screenshot", (path,))
+
+    # ── Queue ────────────────────────────────────────────────
+
+    def _put(self, kind, args):
+        with self._cond:
+            self.issued += 1
+            if kind in self.MERGEABLE and self._merge(kind, args):
+                self.coalesced += 1
+                return
+            if len(self._q) >= self.maxlen:
+                self._drop_one()
+            self._q.append((kind, args))
+            self._cond.notify()
+
+    def _merge(self, kind, args):
+        """Fold into the newest pending intent of the same kind, unless a
+        click/hotkey/screenshot sits between them (those depend on order)."""
+        for i in range(len(self._q) - 1, -1, -1):
+            k, a = self._q[i]
+            if k not in self.MERGEABLE:
+                return False
+            if k != kind:
+                continue
+            if kind == "move":
+                self._q[i] = (kind, args)
+                return True
+            if a[1] == args[1]:
+                self._q[i] = (kind, (a[0] + args[0], a[1]))
+                return True
+        return False
+
+    def _drop_one(self):
+        """Oldest move/scroll goes first; clicks and keys only as a last resort."""
+        for i, (k, _) in enumerate(self._q):
+            if k in self.MERGEABLE:
+                del self._q[i]
+                break
+        else:
+            self._q.popleft()
+        self.dropped += 1
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._q and not self._closed:
+                    self._cond.wait()
+                if not self._q:
+                    return
+                kind, args = self._q.popleft()
+            try:
+                getattr(self.backend, kind)(*args)
+                self.sent += 1
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"Input backend {self.backend.name!r} failed on {kind}: {e}")
+
+    def close(self, timeout=1.0):
+        """Send what is still queued, then stop the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join(timeout)
+
+    def stats(self):
+        return {"issued": self.issued, "coalesced": self.coalesced,
+                "dropped": self.dropped, "sent": self.sent, "errors": self.errors}
+
+
+def make_input(name="pyautogui", threaded=True):
+    backend = BACKENDS[name]()
+    return InputDispatcher(backend) if threaded else backend
@@ -0,0 +1,221 @@
+"""
+Cursor filters.
+
+Every filter is called as f(t, x, y) → (x, y) with a real timestamp in
+seconds, keeps float sub-pixel state, and is parameterised in time
+units (Hz, seconds) rather than frames, so it behaves the same at 15,
+30 or 60 FPS.
+
+    none     pass-through
+    ema      exponential smoothing with time constant tau
+    euro     One Euro filter: heavy smoothing when the hand is slow,
+             little lag when it moves fast (Casiez et al., CHI 2012)
+    kalman   constant-velocity Kalman filter; output is extrapolated
+             `lead` seconds ahead to cancel pipeline latency
+
+evaluate() scores a filter on a recorded trace (lag and jitter).
+"""
+import math
+
+import numpy as np
+
+# ─────────────────────────────────────────────────────────────
+#  Filters
+# ─────────────────────────────────────────────────────────────
+
+class NoFilter:
+    def __call__(self, t, x, y):
+        return x, y
+
+    def reset(self):
+        pass
+
+
+class EmaFilter:
+    """
+    Time-based EMA. tau=0.116 s matches the old SMOOTH=4 divisor at
+    30 FPS (alpha = 1/4 per frame) but stays the same at any frame rate.
+    """
+
+    def __init__(self, tau=0.116):
+        self.tau = tau
+        self.reset()
+
+    def reset(self):
+        self.t = self.x = self.y = None
+
+    def __call__(self, t, x, y):
+        if self.t is None:
+            self.t, self.x, self.y = t, x, y
+            return x, y
+        dt = max(t - self.t, 1e-6)
+        a  = 1.0 - math.exp(-dt / self.tau)
+        self.t  = t
+        self.x += a * (x - self.x)
+        self.y += a * (y - self.y)
+        return self.x, self.y
+
+
+class _LowPass:
+    __slots__ = ("v",)
+
+    def __init__(self):
+        self.v = None
+
+    def __call__(self, v, a):
+        self.v = v if self.v is None else self.v + a * (v - self.v)
+        return self.v
+
+
+def _alpha(cutoff, dt):
+    r = 2.0 * math.pi * cutoff * dt
+    return r / (r + 1.0)
+
+
+class OneEuroFilter:
+    """
+    min_cutoff  Hz, smoothing when still (lower = steadier, more lag)
+    beta        cutoff increase per px/s of speed (higher = less lag)
+    d_cutoff    Hz, smoothing of the speed estimate itself
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.004, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta       = beta
+        self.d_cutoff   = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.t  = None
+        self.xf, self.yf   = _LowPass(), _LowPass()
+        self.dxf, self.dyf = _LowPass(), _LowPass()
+
+    def __call__(self, t, x, y):
+        if self.t is None:
+            self.t = t
+            return self.xf(x, 1.0), self.yf(y, 1.0)
+        dt = max(t - self.t, 1e-6)
+        self.t = t
+        ad = _alpha(self.d_cutoff, dt)
+        dx = self.dxf((x - self.xf.v) / dt, ad)
+        dy = self.dyf((y - self.yf.v) / dt, ad)
+        speed = math.hypot(dx, dy)
+        a = _alpha(self.min_cutoff + self.beta * speed, dt)
+        return self.xf(x, a), self.yf(y, a)
+
+
+class KalmanFilter:
+    """
+    Constant-velocity model per axis, state (position, velocity).
+
+    q     process noise: acceleration spectral density, px²/s³
+    r     measurement noise variance, px²
+    lead  seconds to extrapolate the output (≈ capture→cursor latency)
+    """
+
+    def __init__(self, q=1e4, r=16.0, lead=0.03):
+        self.q, self.r, self.lead = q, r, lead
+        self.reset()
+
+    def reset(self):
+        self.t = None
+        # per axis: [p, v, P00, P01, P11]
+        self.ax = [None, None]
+
+    def _step(self, s, z, dt):
+        p, v, P00, P01, P11 = s
+        # predict
+        p += v * dt
+        q = self.q
+        P00 += dt * (2 * P01 + dt * P11) + q * dt**3 / 3
+        P01 += dt * P11 + q * dt**2 / 2
+        P11 += q * dt
+        # update
+        S  = P00 + self.r
+        k0, k1 = P00 / S, P01 / S
+        e  = z - p
+        p += k0 * e
+        v += k1 * e
+        P11 -= k1 * P01
+        P01 -= k0 * P01
+        P00 -= k0 * P00
+        s[:] = p, v, P00, P01, P11
+        return p + v * self.lead
+
+    def __call__(self, t, x, y):
+        if self.t is None:
+            self.t  = t
+            self.ax = [[x, 0.0, self.r, 0.0, 1e6],
+                       [y, 0.0, self.r, 0.0, 1e6]]
+            return x, y
+        dt = max(t - self.t, 1e-6)
+        self.t = t
+        return self._step(self.ax[0], x, dt), self._step(self.ax[1], y, dt)
+
+
+FILTERS = {
+    "none":   NoFilter,
+    "ema":    EmaFilter,
+    "euro":   OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def make_filter(name, **params):
+    return FILTERS[name](**params)
+
+# ─────────────────────────────────────────────────────────────
+#  Offline evaluation
+# ─────────────────────────────────────────────────────────────
+
+STILL_SPEED = 60.0    # px/s — below this the hand is "holding still"
+MAX_LAG     = 0.24    # s — longest lag searched for
+
+
+def evaluate(filt, t, xy):
+    """
+    Run filt over a trace (t: (N,) seconds, xy: (N, 2) screen px) and
+    return:
+
+        lag_ms      delay that best aligns output with input while moving
+        jitter_px   RMS frame-to-frame motion of the output while still
+        raw_jitter  the same for the unfiltered input, for reference
+    """
+    t  = np.asarray(t, np.float64)
+    xy = np.asarray(xy, np.float64)
+    filt.reset()
+    out = np.array([filt(ti, x, y) for ti, (x, y) in zip(t, xy)])
+
+    # hand speed from a ~150 ms moving average, so that sensor noise
+    # alone does not count as motion
+    dt = np.diff(t)
+    dt[dt <= 0] = 1e-6
+    n  = max(3, int(round(0.15 / np.median(dt))))
+    k  = np.ones(n) / n
+    sm = np.stack([np.convolve(xy[:, i], k, mode="same") for i in (0, 1)], 1)
+    speed  = np.hypot(*np.diff(sm, axis=0).T) / dt
+    moving = speed >= STILL_SPEED
+    # "still" = no motion within n frames either side, so a filter that
+    # is still settling after a move is not scored as jitter
+    still = np.convolve(moving, np.ones(2 * n + 1), mode="same") == 0
+
+    def rms_step(a):
+        if not still.any():
+            return 0.0
+        return float(np.sqrt((np.diff(a, axis=0)[still] ** 2).sum(1).mean()))
+
+    lag = 0.0
+    if moving.sum() > 2:
+        idx  = np.flatnonzero(moving) + 1
+        best = None
+        # negative shifts: a predicting filter can lead its input
+        for shift in np.arange(-MAX_LAG / 2, MAX_LAG, 0.002).round(3):
+            rx  = np.interp(t[idx] - shift, t, xy[:, 0])
+            ry  = np.interp(t[idx] - shift, t, xy[:, 1])
+            err = np.mean((out[idx, 0] - rx) ** 2 + (out[idx, 1] - ry) ** 2)
+            if best is None or err < best:
+                best, lag = err, shift
+
+    return {"lag_ms":     float(lag) * 1000.0,
+            "jitter_px":  rms_step(out),
+            "raw_jitter": rms_step(xy)}
@@ -0,0 +1,210 @@
+"""
+Table-driven gesture engine.
+
+Each frame the five finger states are packed into a 5-bit mask (bit i
+set when FINGERS[i] is up, see landmarks.pack). Gestures are rows of a
+table loaded from a JSON file (gestures.json by default):
+
+    {"fingers": "001xx", "action": "left_click"}
+
+`fingers` lists thumb, index, middle, ring, pinky as 1 (up), 0 (down)
+or x (either). Rows are compiled once into a 32-entry lookup per mode;
+the first matching row wins, so a frame is resolved with one index.
+
+A row only becomes active after it has won at least n of the last m
+frames (`debounce`), so a single noisy frame neither fires nor cancels
+a gesture. Once active, a row fires:
+
+    once        on activation (default), after the shared `cooldown`
+    "hold": s   once, after being active for s seconds
+    "every": s  repeatedly while active, at most every s seconds
+                (0 = every frame); not subject to the cooldown
+
+Mode switches come from the separate `switch` table, which applies in
+every mode and fires like a "once" row.
+"""
+import json
+import os
+from collections import Counter, deque
+
+from landmarks import FINGERS
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures.json")
+
+
+def parse_fingers(pattern):
+    """"01x1x" → (bits, care) masks over FINGERS."""
+    if len(pattern) != len(FINGERS) or set(pattern) - set("01x"):
+        raise ValueError(f"bad finger pattern {pattern!r}: want {len(FINGERS)} "
+                         f"of 0/1/x ordered {', '.join(FINGERS)}")
+    bits = care = 0
+    for i, c in enumerate(pattern):
+        if c != "x":
+            care |= 1 << i
+            bits |= (c == "1") << i
+    return bits, care
+
+
+def compile_rows(rows):
+    """Rows → tuple of 32 row indices (-1: no gesture), first match wins."""
+    parsed = [parse_fingers(r["fingers"]) for r in rows]
+    n = 1 << len(FINGERS)
+    return tuple(next((i for i, (bits, care) in enumerate(parsed)
+                       if mask & care == bits), -1)
+                 for mask in range(n))
+
+
+class GestureTable:
+    """
+    A loaded gesture file: switch rows, per-mode rows and their lookups.
+
+    actions, modes: when given, every row must name one of these actions
+    and every mode section and switch target one of these modes, so a
+    bad file fails on load rather than when the gesture is first made.
+    """
+
+    def __init__(self, config, actions=None, modes=None):
+        self.cooldown = float(config.get("cooldown", 0.5))
+        deb = config.get("debounce", {})
+        self.n, self.m = int(deb.get("n", 3)), int(deb.get("m", 4))
+        if not 1 <= self.n <= self.m:
+            raise ValueError(f"debounce needs 1 <= n <= m, got n={self.n} m={self.m}")
+
+        self.switch = list(config.get("switch", []))
+        self.rows   = {mode: list(rows) for mode, rows in config.get("modes", {}).items()}
+        if modes is not None:
+            for mode in self.rows:
+                if mode not in modes:
+                    raise ValueError(f"unknown mode {mode!r}: want one of {', '.join(modes)}")
+        for r in self.switch:
+            if r.get("to") not in self.rows:
+                raise ValueError(f"switch row {r!r} targets unknown mode")
+        if actions is not None:
+            for mode, rows in self.rows.items():
+                for r in rows:
+                    if r.get("action") not in actions:
+                        raise ValueError(f"{mode}: unknown action {r.get('action')!r}")
+
+        self.switch_lut = compile_rows(self.switch)
+        self.lut = {mode: compile_rows(rows) for mode, rows in self.rows.items()}
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH, actions=None, modes=None):
+        with open(path) as f:
+            return cls(json.load(f), actions, modes)
+
+    @property
+    def modes(self):
+        return list(self.rows)
+
+
+class Debouncer:
+    """Reports a row index once it has at least n votes among the last m frames."""
+
+    def __init__(self, n, m):
+        self.n     = n
+        self.votes = deque(maxlen=m)
+        self.count = Counter()
+
+    def reset(self):
+        self.votes.clear()
+        self.count.clear()
+
+    def update(self, row):
+        if len(self.votes) == self.votes.maxlen:
+            old = self.votes[0]
+            self.count[old] -= 1
+        self.votes.append(row)
+        self.count[row] += 1
+        best, k = -1, 0
+        for r, c in self.count.items():
+            if r != -1 and c > k:
+                best, k = r, c
+        return best if k >= self.n else -1
+
+
+class _Active:
+    """Firing state of the currently active row of one table."""
+    __slots__ = ("row", "since", "fired", "last_fire")
+
+    def __init__(self):
+        self.row = -1
+
+    def enter(self, row, now):
+        if row != self.row:
+            self.row, self.since, self.fired, self.last_fire = row, now, False, None
+
+
+class Step:
+    """What the engine decided for one frame."""
+    __slots__ = ("switch", "switch_hint", "action", "fire", "progress")
+
+    def __init__(self):
+        self.switch      = None    # mode to switch to now
+        self.switch_hint = None    # mode the current frame's switch gesture points to
+        self.action      = None    # active row of the current mode (dict)
+        self.fire        = False   # the action should be performed this frame
+        self.progress    = None    # 0..1 while a "hold" row is being held
+
+
+class GestureEngine:
+    def __init__(self, table):
+        self.table  = table
+        self._sw    = Debouncer(table.n, table.m)
+        self._act   = Debouncer(table.n, table.m)
+        self._sw_on = _Active()
+        self._on    = _Active()
+        self._mode  = None
+        self.last_act = float("-inf")
+
+    def reset(self):
+        """Forget gesture history (hand lost, replay restart)."""
+        self._sw.reset()
+        self._act.reset()
+        self._sw_on = _Active()
+        self._on    = _Active()
+
+    def update(self, mode, mask, now):
+        t    = self.table
+        step = Step()
+
+        # ── Mode switch ──────────────────────────────────────
+        raw = t.switch_lut[mask]
+        if raw != -1:
+            step.switch_hint = t.switch[raw]["to"]
+        sw = self._sw.update(raw)
+        self._sw_on.enter(sw, now)
+        if sw != -1 and not self._sw_on.fired and now - self.last_act > t.cooldown:
+            target = t.switch[sw]["to"]
+            if target != mode:
+                step.switch   = target
+                mode          = target
+                self.last_act = now
+            self._sw_on.fired = True
+
+        # ── Mode action ──────────────────────────────────────
+        if mode != self._mode:
+            self._mode = mode
+            self._act.reset()
+            self._on = _Active()
+        lut = t.lut.get(mode)
+        row = self._act.update(lut[mask] if lut is not None else -1)
+        on  = self._on
+        on.enter(row, now)
+        if row == -1:
+            return step
+
+        r = t.rows[mode][row]
+        step.action = r
+        if "every" in r:
+            if on.last_fire is None or now - on.last_fire >= r["every"]:
+                step.fire, on.last_fire = True, now
+        elif not on.fired:
+            held = now - on.since
+            if "hold" in r and held < r["hold"]:
+                step.progress = held / r["hold"]
+            elif now - self.last_act > t.cooldown:
+                step.fire, on.fired, self.last_act = True, True, now
+            elif "hold" in r:
+                step.progress = 1.0
+        return step
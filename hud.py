@@ -0,0 +1,205 @@
+"""
+HUD compositor for the Gesture Control preview.
+
+The badge, legend, hint line and flash-banner text never change while
+the mode and frame size stay the same. They are rendered once into
+premultiplied tiles (colour already scaled by alpha, plus a 1-alpha
+map) and each frame only blends those sub-rectangles:
+
+    roi = roi * (1 - alpha) + colour
+
+No full-frame copies are made. The tiles for a mode are rebuilt only
+when the mode is first seen or when the frame size changes.
+"""
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+
+@lru_cache(maxsize=64)
+def text_size(text, font, scale, thickness):
+    """cv2.getTextSize, memoised — HUD strings repeat every frame."""
+    return cv2.getTextSize(text, font, scale, thickness)[0]
+
+# ─────────────────────────────────────────────────────────────
+#  Tiles
+# ─────────────────────────────────────────────────────────────
+
+class Tile:
+    """Premultiplied overlay for one sub-rectangle of the frame."""
+    __slots__ = ("x", "y", "pm", "inv")
+
+    def __init__(self, x, y, pm, inv):
+        self.x, self.y = x, y
+        self.pm  = pm      # uint8 colour * alpha
+        self.inv = inv     # uint8 (1 - alpha) * 255, 3 channels
+
+    def blend(self, frame):
+        h, w = self.pm.shape[:2]
+        roi = frame[self.y:self.y+h, self.x:self.x+w]
+        cv2.multiply(roi, self.inv, roi, scale=1/255)
+        cv2.add(roi, self.pm, roi)
+
+
+class Layer:
+    """
+    Builds a Tile by painting shapes with "over" compositing. Each
+    paint() draws its shape into a coverage mask (anti-aliasing
+    included), so the tile matches drawing the same calls straight
+    onto the frame.
+    """
+
+    def __init__(self, x1, y1, x2, y2, frame_w, frame_h):
+        # clip to the frame; drawing stays in frame coordinates
+        self.x1, self.y1 = max(0, x1), max(0, y1)
+        self.x2, self.y2 = min(frame_w, x2), min(frame_h, y2)
+        h, w = max(0, self.y2 - self.y1), max(0, self.x2 - self.x1)
+        self.C = np.zeros((h, w, 3), np.float32)
+        self.A = np.zeros((h, w, 1), np.float32)
+        self._mask = np.zeros((h, w), np.uint8)
+
+    def paint(self, color, alpha, draw):
+        """draw(mask, dx, dy) renders the shape in 255 on mask, offset by dx/dy."""
+        if not self._mask.size:
+            return
+        self._mask[:] = 0
+        draw(self._mask, -self.x1, -self.y1)
+        cov = self._mask[..., None].astype(np.float32) * (alpha / 255.0)
+        self.C *= 1.0 - cov
+        self.C += cov * np.array(color, np.float32)
+        self.A *= 1.0 - cov
+        self.A += cov
+
+    def tile(self):
+        if not self._mask.size:
+            return None
+        pm  = np.rint(self.C).astype(np.uint8)
+        inv = np.rint((1.0 - self.A) * 255.0).astype(np.uint8)
+        return Tile(self.x1, self.y1, pm, np.repeat(inv, 3, axis=2))
+
+# ─────────────────────────────────────────────────────────────
+#  Shapes (drawn into a Layer mask)
+# ─────────────────────────────────────────────────────────────
+
+def rounded_rect(x1, y1, x2, y2, r):
+    def draw(m, dx, dy):
+        a1, b1, a2, b2 = x1+dx, y1+dy, x2+dx, y2+dy
+        cv2.rectangle(m, (a1+r, b1), (a2-r, b2), 255, -1)
+        cv2.rectangle(m, (a1, b1+r), (a2, b2-r), 255, -1)
+        for cx, cy in [(a1+r,b1+r),(a2-r,b1+r),(a1+r,b2-r),(a2-r,b2-r)]:
+            cv2.circle(m, (cx,cy), r, 255, -1)
+    return draw
+
+
+def rect(x1, y1, x2, y2):
+    def draw(m, dx, dy):
+        cv2.rectangle(m, (x1+dx, y1+dy), (x2+dx, y2+dy), 255, -1)
+    return draw
+
+
+def text(txt, x, y, font, scale, thickness):
+    def draw(m, dx, dy):
+        cv2.putText(m, txt, (x+dx, y+dy), font, scale, 255, thickness, cv2.LINE_AA)
+    return draw
+
+
+def _text_box(txt, x, y, font, scale, thickness):
+    tw, th = text_size(txt, font, scale, thickness)
+    return x, y - th - 2, x + tw + 2, y + th // 2 + 4
+
+# ─────────────────────────────────────────────────────────────
+#  Compositor
+# ─────────────────────────────────────────────────────────────
+
+HINT = "Thumb OPEN=move  CLOSED=stop  |  Switch: Pinky=SCROLL  Thumb=MOUSE  Thumb+Index=ZOOM"
+
+
+class HudCompositor:
+    """Draws the HUD (badge, flash banner, legend, hint) from cached tiles."""
+
+    def __init__(self, modes, colors, labels):
+        self.modes  = modes
+        self.colors = colors
+        self.labels = labels
+        self.size   = None
+        self._tiles = {}      # mode → (badge, [legend, hint], banner text)
+        self._band  = {}      # mode → solid banner strip
+
+    def _build(self, mode, w, h):
+        col   = self.colors[mode]
+        tiles = []
+
+        # ── Top-right mode badge ──────────────────────────────
+        bw, bh = 340, 56
+        bx, by = w - bw - 14, 12
+        sub = self.labels[mode].split("-",1)[-1].strip()
+        L = Layer(bx, by, bx+bw+1, by+bh+1, w, h)
+        L.paint((12,12,22), 0.85, rounded_rect(bx, by, bx+bw, by+bh, 12))
+        L.paint(col, 1.0, rect(bx, by+8, bx+5, by+bh-8))
+        L.paint(col, 1.0, text(mode, bx+16, by+24, cv2.FONT_HERSHEY_DUPLEX, 0.78, 1))
+        L.paint((160,160,175), 1.0, text(sub, bx+16, by+46, cv2.FONT_HERSHEY_SIMPLEX, 0.40, 1))
+        tiles.append(L.tile())
+
+        # ── Bottom legend ─────────────────────────────────────
+        lx, ly = 14, h - 110
+        rows = []
+        for m in self.modes:
+            label = (self.labels[m].split("-")[0].strip() + " - " +
+                     self.labels[m].split("-",1)[-1].strip()[:28])
+            rows.append((m, label, ly))
+            ly += 32
+        tx2 = max(_text_box(lab, lx+8, y+18, cv2.FONT_HERSHEY_SIMPLEX, 0.38, 1)[2]
+                  for _, lab, y in rows)
+        L = Layer(lx, h - 110, max(lx+221, tx2), ly, w, h)
+        for m, label, y in rows:
+            active = (m == mode)
+            bg = self.colors[m] if active else (32,32,42)
+            tc = (255,255,255) if active else (120,120,135)
+            L.paint(bg, 0.78, rounded_rect(lx, y, lx+220, y+28, 5))
+            L.paint(tc, 1.0, text(label, lx+8, y+18, cv2.FONT_HERSHEY_SIMPLEX, 0.38, 1))
+        tiles.append(L.tile())
+
+        # ── Thumb hint (always visible) ───────────────────────
+        L = Layer(*_text_box(HINT, 14, h-8, cv2.FONT_HERSHEY_SIMPLEX, 0.33, 1), w, h)
+        L.paint((100,100,118), 1.0, text(HINT, 14, h-8, cv2.FONT_HERSHEY_SIMPLEX, 0.33, 1))
+        tiles.append(L.tile())
+
+        # ── Flash banner text (band alpha changes, so it is blended live)
+        txt = f"  {mode} MODE  "
+        tw, _ = text_size(txt, cv2.FONT_HERSHEY_DUPLEX, 1.3, 2)
+        L = Layer(w//2 - tw//2, h//2-36, w//2 + tw//2 + 4, h//2+36, w, h)
+        L.paint((255,255,255), 1.0, text(txt, w//2 - tw//2, h//2+16,
+                                          cv2.FONT_HERSHEY_DUPLEX, 1.3, 2))
+        banner = L.tile()
+
+        self._tiles[mode] = (tiles[0], [t for t in tiles[1:] if t is not None], banner)
+        y1, y2 = max(0, h//2-36), min(h, h//2+37)
+        self._band[mode] = np.full((y2 - y1, w, 3), col, np.uint8)
+
+    def draw(self, frame, mode, flash_t, now):
+        h, w = frame.shape[:2]
+        if self.size != (w, h):
+            self.size = (w, h)
+            self._tiles.clear()
+            self._band.clear()
+        if mode not in self._tiles:
+            self._build(mode, w, h)
+        badge, rest, banner = self._tiles[mode]
+
+        if badge is not None:
+            badge.blend(frame)
+
+        # ── Flash banner on mode switch ───────────────────────
+        elapsed = now - flash_t
+        if elapsed < 1.0:
+            a    = max(0.0, 1.0 - elapsed) * 0.55
+            y1   = max(0, h//2-36)
+            band = self._band[mode]
+            roi  = frame[y1:y1+band.shape[0]]
+            cv2.addWeighted(band, a, roi, 1-a, 0, roi)
+            if banner is not None:
+                banner.blend(frame)
+
+        for t in rest:                              # legend, hint
+            t.blend(frame)
@@ -0,0 +1,178 @@
+"""
+Idle power mode for Gesture Control.
+
+After `idle_after` seconds without a hand the loop goes idle: the
+camera is switched to a small resolution and low frame rate, and
+MediaPipe no longer runs. Each idle frame only goes through
+MotionGate, a frame difference on a tiny grey thumbnail, looking at
+the ROI plus a margin. Once motion shows up there the loop wakes: that
+same frame is handed to MediaPipe and the camera goes back to its
+normal settings.
+
+Camera settings are only changed from the capture thread (apply()),
+never from the thread that decides to sleep or wake.
+
+stats() reports time, CPU (process time / wall time, all threads) and
+frames for each state, plus wake latency: from the first frame with
+motion to the first frame in which a hand was found.
+"""
+import time
+
+import cv2
+import numpy as np
+
+from pipeline import LatencyMeter
+
+# ─────────────────────────────────────────────────────────────
+#  Motion gate
+# ─────────────────────────────────────────────────────────────
+
+class MotionGate:
+    """
+    size       thumbnail the difference is computed on
+    threshold  grey-level change counted as motion
+    min_area   share of the watched region that must change
+    frames     consecutive frames with motion needed (ignores flicker)
+    """
+
+    def __init__(self, size=(80, 60), threshold=18, min_area=0.01, frames=2):
+        self.size      = size
+        self.threshold = threshold
+        self.min_area  = min_area
+        self.frames    = frames
+        self.prev      = None
+        self._run      = 0
+
+    def reset(self):
+        self.prev = None
+        self._run = 0
+
+    def __call__(self, frame, region):
+        """frame: BGR of any size; region: (x1, y1, x2, y2) as fractions of it."""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray  = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (3, 3), 0)
+        prev, self.prev = self.prev, gray
+        if prev is None:
+            return False
+        w, h = self.size
+        x1, y1, x2, y2 = region
+        x1, x2 = int(max(0.0, x1) * w), int(np.ceil(min(1.0, x2) * w))
+        y1, y2 = int(max(0.0, y1) * h), int(np.ceil(min(1.0, y2) * h))
+        diff  = cv2.absdiff(gray[y1:y2, x1:x2], prev[y1:y2, x1:x2])
+        moved = np.count_nonzero(diff > self.threshold) >= self.min_area * diff.size
+        self._run = self._run + 1 if moved else 0
+        return self._run >= self.frames
+
+# ─────────────────────────────────────────────────────────────
+#  Idle controller
+# ─────────────────────────────────────────────────────────────
+
+class IdleMode:
+    def __init__(self, idle_after=30.0, idle_size=(320, 240), idle_fps=10,
+                 margin=0.1, gate=None):
+        self.idle_after = idle_after
+        self.idle_size  = idle_size
+        self.idle_fps   = idle_fps
+        self.margin     = margin
+        self.gate       = gate or MotionGate()
+        self.asleep     = False
+        self.active     = None          # (w, h, fps) to restore on wake
+        self._applied   = False         # camera matches self.asleep
+        self._last_hand = time.perf_counter()
+        self._last_grab = 0.0
+        self._wake_t    = None          # capture time of the frame that woke us
+        self.wakes      = 0
+        self.wake_latency = LatencyMeter(100)
+
+        # per state: [wall seconds, cpu seconds, frames]
+        self.usage   = {"active": [0.0, 0.0, 0], "idle": [0.0, 0.0, 0]}
+        self._mark   = (time.perf_counter(), time.process_time())
+
+    @property
+    def state(self):
+        return "idle" if self.asleep else "active"
+
+    def _account(self):
+        wall, cpu = time.perf_counter(), time.process_time()
+        u = self.usage[self.state]
+        u[0] += wall - self._mark[0]
+        u[1] += cpu - self._mark[1]
+        self._mark = (wall, cpu)
+
+    def _switch(self, asleep):
+        self._account()
+        self.asleep   = asleep
+        self._applied = False
+
+    # ── Capture thread ───────────────────────────────────────
+
+    def apply(self, cap):
+        """Bring the camera in line with the state; throttle while idle."""
+        if not self._applied:
+            if self.active is None:
+                self.active = (cap.get(cv2.CAP_PROP_FRAME_WIDTH),
+                               cap.get(cv2.CAP_PROP_FRAME_HEIGHT),
+                               cap.get(cv2.CAP_PROP_FPS))
+            w, h, fps = (self.idle_size + (self.idle_fps,)) if self.asleep else self.active
+            if w and h:
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH,  w)
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+            if fps:
+                cap.set(cv2.CAP_PROP_FPS, fps)
+            self._applied = True
+        if self.asleep:
+            # many drivers ignore CAP_PROP_FPS; sleep the difference
+            wait = self._last_grab + 1.0 / self.idle_fps - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        self._last_grab = time.perf_counter()
+
+    # ── Inference thread ─────────────────────────────────────
+
+    def region(self, roi):
+        """ROI (fractions, in the mirrored preview) → grown region in the raw frame."""
+        l, r, t, b = roi
+        m = self.margin
+        return 1.0 - r - m, t - m, 1.0 - l + m, b + m
+
+    def wake_check(self, frame, roi, t_cap):
+        """While idle: True (and wake up) when there is motion near the ROI."""
+        self.usage["idle"][2] += 1
+        if not self.gate(frame, self.region(roi)):
+            return False
+        self._wake_t    = t_cap
+        self._last_hand = time.perf_counter()
+        self.wakes     += 1
+        self._switch(False)
+        return True
+
+    def observe(self, hand):
+        """After inference: go idle once no hand has been seen for idle_after."""
+        now = time.perf_counter()
+        self.usage["active"][2] += 1
+        if hand:
+            self._last_hand = now
+            if self._wake_t is not None:
+                self.wake_latency.add(now - self._wake_t)
+                self._wake_t = None
+        elif now - self._last_hand > self.idle_after:
+            self._wake_t = None
+            self.gate.reset()
+            self._switch(True)
+
+    def stats(self):
+        self._account()                    # fold in the time spent so far
+        out = {"state": self.state, "wakes": self.wakes,
+               "wake_ms": self.wake_latency.summary()}
+        for name, (wall, cpu, frames) in self.usage.items():
+            out[name] = {"seconds": wall, "frames": frames,
+                         "cpu_pct": 100.0 * cpu / wall if wall > 0 else 0.0,
+                         "fps": frames / wall if wall > 0 else 0.0}
+        return out
+
+
+def format_stats(s):
+    a, i, w = s["active"], s["idle"], s["wake_ms"]
+    return (f"active {a['seconds']:.0f}s cpu {a['cpu_pct']:.0f}% {a['fps']:.1f}fps  "
+            f"idle {i['seconds']:.0f}s cpu {i['cpu_pct']:.0f}% {i['fps']:.1f}fps  "
+            f"{s['wakes']} wakes, hand after p50 {w['p50_ms']:.0f} ms / p95 {w['p95_ms']:.0f} ms")
@@ -0,0 +1,373 @@
+"""
+MediaPipe inference with hand-tracked crops and an adaptive resolution
+governor.
+
+With crop=True, MediaPipe sees a square crop around the hand found in
+the previous frame instead of the whole picture; landmarks are mapped
+back to full-frame normalised coordinates, so callers cannot tell the
+difference. The crop is only moved when the hand nears its edge or
+changes size a lot.
+
+MediaPipe's own tracker carries the hand rectangle of one frame to the
+next in normalised input-image coordinates. Full frames and crops are
+different images, and so are two crops placed at different boxes, so
+crops go to a second Hands graph (crop_hands) and that graph is reset
+whenever it is given a new box: its first crop then starts from palm
+detection instead of a rectangle that points at the wrong pixels. The
+full-frame graph only ever sees full frames. When the hand is lost
+inside the crop the next frame goes full-frame again (a
+re-acquisition).
+
+With target_fps set, the governor scales the image fed to MediaPipe up
+or down in steps to hold that inference rate on the current CPU.
+
+With flow=True, MediaPipe only runs every few frames. In between, the
+21 landmarks of the last result are carried forward with pyramidal
+Lucas-Kanade optical flow (FlowTracker). How many frames are bridged
+is chosen after every inference from hand speed and confidence, and
+any frame whose flow fails its forward-backward check goes back to
+full inference.
+"""
+import time
+
+import cv2
+import numpy as np
+
+from landmarks import to_array
+from pipeline import RateMeter
+
+# ─────────────────────────────────────────────────────────────
+#  Resolution governor
+# ─────────────────────────────────────────────────────────────
+
+class ResolutionGovernor:
+    """Picks an input scale so that inference time fits 1/target_fps."""
+
+    SCALES = (0.4, 0.5, 0.625, 0.75, 0.875, 1.0)
+
+    def __init__(self, target_fps, window=15, alpha=0.2):
+        self.budget = 1.0 / target_fps
+        self.window = window      # frames between decisions
+        self.alpha  = alpha       # EMA weight of the newest sample
+        self.reset()
+
+    def reset(self):
+        """Back to full scale (the camera or its resolution changed)."""
+        self.idx    = len(self.SCALES) - 1
+        self.ema    = None
+        self._n     = 0
+
+    @property
+    def scale(self):
+        return self.SCALES[self.idx]
+
+    def update(self, seconds):
+        self.ema = seconds if self.ema is None else \
+                   self.ema + self.alpha * (seconds - self.ema)
+        self._n += 1
+        if self._n < self.window:
+            return
+        self._n = 0
+        if self.ema > self.budget * 1.05 and self.idx > 0:
+            self.idx -= 1
+            self.ema = None
+        elif self.ema < self.budget * 0.6 and self.idx < len(self.SCALES) - 1:
+            self.idx += 1
+            self.ema = None
+
+# ─────────────────────────────────────────────────────────────
+#  Optical-flow propagation
+# ─────────────────────────────────────────────────────────────
+
+class FlowTracker:
+    """
+    Propagates landmarks between inferences with cv2.calcOpticalFlowPyrLK.
+
+    max_skip  most frames bridged by flow after one inference
+    v_ref     hand speed (frame widths per frame) that halves the skip
+    min_conf  below this MediaPipe hand score, never skip
+    max_fb    forward-backward error (px) above which a point is untrusted
+    min_good  share of trusted points needed, else fall back to inference
+
+    Untrusted points (e.g. on texture-less skin) are moved with the
+    similarity transform fitted to the trusted ones, so the hand shape
+    is kept.
+    """
+
+    def __init__(self, max_skip=3, v_ref=0.02, min_conf=0.85,
+                 max_fb=1.5, min_good=0.6, win=21, levels=3):
+        self.max_skip = max_skip
+        self.v_ref    = v_ref
+        self.min_conf = min_conf
+        self.max_fb   = max_fb
+        self.min_good = min_good
+        self.lk = dict(winSize=(win, win), maxLevel=levels,
+                       criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+        self.prev   = None      # grey frame the points belong to
+        self.px     = None      # (21, 1, 2) float32 pixel positions
+        self.z      = None
+        self.left   = 0         # flow frames still allowed before inference
+        self.skip   = 0         # skip chosen at the last inference
+        self._c     = None      # hand centre of the previous output, normalised
+        self.frames    = 0
+        self.fallbacks = 0
+
+    def _speed(self, pts):
+        c = pts[:, :2].mean(0)
+        v = 0.0 if self._c is None else float(np.hypot(*(c - self._c)))
+        self._c = c
+        return v
+
+    def reset(self):
+        """Forget the tracked points; the next frame goes to inference."""
+        self.prev, self.px, self._c, self.left = None, None, None, 0
+
+    def seed(self, gray, pts, conf):
+        """Start from a fresh inference result (pts None: hand lost)."""
+        if pts is None:
+            self.px, self._c, self.left = None, None, 0
+            return
+        v = self._speed(pts)
+        if conf < self.min_conf:
+            self.skip = 0
+        else:
+            self.skip = int(self.max_skip / (1.0 + v / self.v_ref))
+        H, W = gray.shape[:2]
+        self.prev = gray
+        self.px   = (pts[:, :2] * np.array([W, H], np.float32)).reshape(-1, 1, 2)
+        self.z    = pts[:, 2].copy()
+        self.left = self.skip
+
+    def step(self, gray):
+        """Landmarks for this frame by flow, or None when inference is due."""
+        if self.px is None or self.left <= 0:
+            return None
+        if gray.shape != self.prev.shape:
+            # the camera changed resolution: the points belong to another image
+            self.reset()
+            return None
+        nxt, st, _  = cv2.calcOpticalFlowPyrLK(self.prev, gray, self.px, None, **self.lk)
+        back, sb, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev, nxt, None, **self.lk)
+        fb   = np.hypot(*(back - self.px).reshape(-1, 2).T)
+        good = (st.ravel() == 1) & (sb.ravel() == 1) & (fb < self.max_fb)
+        if good.mean() < self.min_good:
+            self.fallbacks += 1
+            self.left = 0
+            return None
+        if not good.all():
+            M, _ = cv2.estimateAffinePartial2D(self.px[good], nxt[good])
+            if M is None:
+                self.fallbacks += 1
+                self.left = 0
+                return None
+            nxt[~good] = cv2.transform(self.px[~good], M)
+        self.prev, self.px = gray, nxt
+        self.left   -= 1
+        self.frames += 1
+
+        H, W = gray.shape[:2]
+        pts = np.empty((len(nxt), 3), np.float32)
+        pts[:, :2] = nxt.reshape(-1, 2) / np.array([W, H], np.float32)
+        pts[:, 2]  = self.z
+        self._speed(pts)
+        return pts
+
+# ─────────────────────────────────────────────────────────────
+#  Crop inference
+# ─────────────────────────────────────────────────────────────
+
+class HandInference:
+    """
+    rgb frame → (21, 3) full-frame landmarks or None.
+
+    margin:   extra space around the hand bbox, as a fraction of its size
+    min_side: smallest crop side in pixels (MediaPipe struggles below ~128)
+    flow:     bridge frames between inferences with optical flow
+    crop_hands: a second Hands graph for the crops; required with crop=True
+    """
+
+    def __init__(self, hands, crop=False, target_fps=None,
+                 margin=0.6, min_side=160, flow=False, crop_hands=None):
+        if crop and crop_hands is None:
+            raise ValueError("crop=True needs crop_hands, a Hands graph of its own")
+        self.hands    = hands
+        self.crop     = crop
+        self.crop_hands = crop_hands
+        self.governor = ResolutionGovernor(target_fps) if target_fps else None
+        self.flow     = FlowTracker() if flow else None
+        self.margin   = margin
+        self.min_side = min_side
+        self.box      = None          # current crop (x1, y1, x2, y2), pixels
+        self._shape   = None          # (H, W) of the frame the crop was placed on
+        self._graph_box = None        # box crop_hands' tracking state belongs to
+        self.meter    = RateMeter()
+        self._grays   = [None, None]  # reused grey frames: current and the flow's previous
+        self._gi      = 0
+
+        self.crop_frames = 0
+        self.full_frames = 0
+        self.losses      = 0          # hand lost inside a crop
+        self.reacquired  = 0          # full-frame pass found it again
+        self.crop_resets = 0          # crop_hands reset for a new box
+        self._lost       = False
+
+    def reset(self):
+        """
+        Drop per-stream state — crop, flow points, governor scale — when
+        the camera switches resolution (e.g. entering or leaving idle).
+        """
+        self.box   = None
+        self._lost = False
+        if self.flow is not None:
+            self.flow.reset()
+        if self.governor is not None:
+            self.governor.reset()
+
+    def process(self, rgb):
+        if self.flow is None:
+            return self._infer(rgb)[0]
+        gray = self._gray(rgb)
+        pts  = self.flow.step(gray)
+        if pts is not None:
+            if self.crop:
+                self._track(pts, rgb.shape[1], rgb.shape[0])
+            return pts
+        pts, conf = self._infer(rgb)
+        self.flow.seed(gray, pts, conf)
+        return pts
+
+    def _gray(self, rgb):
+        """Grey copy of rgb, alternating between two buffers (the flow keeps the last one)."""
+        self._gi ^= 1
+        out = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY, dst=self._grays[self._gi])
+        self._grays[self._gi] = out
+        return out
+
+    def process_hands(self, rgb):
+        """
+        Every hand in the full frame → [(handedness, pts)], handedness
+        "Left" or "Right" as MediaPipe labels it. Crop and flow only
+        follow a single hand and do not apply here.
+        """
+        img   = rgb
+        scale = self.governor.scale if self.governor else 1.0
+        if scale < 1.0:
+            img = cv2.resize(img, None, fx=scale, fy=scale,
+                             interpolation=cv2.INTER_AREA)
+        self.full_frames += 1
+
+        t0 = time.perf_counter()
+        result = self.hands.process(img)
+        if self.governor:
+            self.governor.update(time.perf_counter() - t0)
+        self.meter.tick()
+
+        if not result.multi_hand_landmarks:
+            return []
+        labels = [h.classification[0].label for h in result.multi_handedness or ()]
+        return [(labels[i] if i < len(labels) else "Right", to_array(lm.landmark))
+                for i, lm in enumerate(result.multi_hand_landmarks)]
+
+    def _infer(self, rgb):
+        """MediaPipe on the full frame or the crop → (pts or None, hand score)."""
+        H, W = rgb.shape[:2]
+        if self.box is not None and self._shape != (H, W):
+            self.box = None           # placed on a frame of another size
+        box  = self.box if self.crop else None
+        if box is None:
+            x1, y1, x2, y2 = 0, 0, W, H
+            self.full_frames += 1
+        else:
+            x1, y1, x2, y2 = box
+            self.crop_frames += 1
+        img = rgb if box is None else rgb[y1:y2, x1:x2]
+
+        scale = self.governor.scale if self.governor else 1.0
+        if scale < 1.0:
+            img = cv2.resize(img, None, fx=scale, fy=scale,
+                             interpolation=cv2.INTER_AREA)
+        elif box is not None:
+            img = np.ascontiguousarray(img)
+
+        if box is None:
+            graph = self.hands
+        else:
+            graph = self.crop_hands
+            if box != self._graph_box:
+                if self._graph_box is not None:
+                    graph.reset()     # its rectangle belongs to the old box
+                    self.crop_resets += 1
+                self._graph_box = box
+
+        t0 = time.perf_counter()
+        result = graph.process(img)
+        if self.governor:
+            self.governor.update(time.perf_counter() - t0)
+        self.meter.tick()
+
+        if not result.multi_hand_landmarks:
+            if box is not None:
+                self.losses += 1
+                self._lost   = True
+            self.box = None
+            return None, 0.0
+
+        pts = to_array(result.multi_hand_landmarks[0].landmark)
+        conf = (result.multi_handedness[0].classification[0].score
+                if result.multi_handedness else 1.0)
+        if box is not None:
+            cw, ch = x2 - x1, y2 - y1
+            pts[:, 0] = (x1 + pts[:, 0] * cw) / W
+            pts[:, 1] = (y1 + pts[:, 1] * ch) / H
+            pts[:, 2] *= cw / W
+        elif self._lost:
+            self.reacquired += 1
+            self._lost = False
+        if self.crop:
+            self._track(pts, W, H)
+        return pts, conf
+
+    def _track(self, pts, W, H):
+        """Keep the crop if the hand is still comfortably inside it, else recentre."""
+        hx1, hy1 = pts[:, 0].min() * W, pts[:, 1].min() * H
+        hx2, hy2 = pts[:, 0].max() * W, pts[:, 1].max() * H
+        size = max(hx2 - hx1, hy2 - hy1)
+        side = int(max(self.min_side, size * (1 + 2 * self.margin)))
+        side = min((side + 31) // 32 * 32, W, H)
+        self._shape = (H, W)
+        if self.box is not None:
+            x1, y1, x2, y2 = self.box
+            inset = size * self.margin * 0.35
+            if (hx1 - inset >= x1 and hy1 - inset >= y1 and
+                    hx2 + inset <= x2 and hy2 + inset <= y2 and
+                    x2 - x1 <= side * 2):
+                return
+        cx, cy = (hx1 + hx2) / 2, (hy1 + hy2) / 2
+        x1 = int(min(max(cx - side / 2, 0), W - side))
+        y1 = int(min(max(cy - side / 2, 0), H - side))
+        self.box = (x1, y1, x1 + side, y1 + side)
+
+    def stats(self):
+        return {"fps":         self.meter.fps,
+                "scale":       self.governor.scale if self.governor else 1.0,
+                "crop_frames": self.crop_frames,
+                "full_frames": self.full_frames,
+                "losses":      self.losses,
+                "reacquired":  self.reacquired,
+                # share of cropped frames that lost the hand and fell back
+                "reacq_rate":  self.losses / self.crop_frames if self.crop_frames else 0.0,
+                "crop_resets": self.crop_resets,
+                "flow_frames": self.flow.frames if self.flow else 0,
+                "flow_fallbacks": self.flow.fallbacks if self.flow else 0,
+                "skip":        self.flow.skip if self.flow else 0}
+
+
+def format_stats(s):
+    txt = (f"infer {s['fps']:4.1f}fps  scale {s['scale']:.2f}  "
+           f"crop {s['crop_frames']}/{s['crop_frames'] + s['full_frames']}  "
+           f"reacq {s['reacq_rate'] * 100:.1f}%")
+    if s["crop_frames"]:
+        txt += f"  crop moves {s['crop_resets']}"
+    if s["flow_frames"] or s["flow_fallbacks"]:
+        txt += f"  flow {s['flow_frames']} (skip {s['skip']}, {s['flow_fallbacks']} fallbacks)"
+    return txt
@@ -0,0 +1,96 @@
+"""
+Hand landmarks as NumPy arrays.
+
+MediaPipe's landmark list is converted once per frame into a contiguous
+(21, 3) float32 array of normalised x, y, z. Everything downstream —
+finger states, distances, pixel coordinates — is vectorised over that
+array, and the same functions accept an (N, 21, 3) stack so thousands
+of recorded frames can be scored in one call (e.g. when tuning
+THUMB_OPEN_DIST against a recording).
+"""
+import numpy as np
+
+N_LANDMARKS = 21
+
+FINGERS = ("thumb", "index", "middle", "ring", "pinky")
+
+# index … pinky: tip, pip, mcp landmark ids
+TIP = np.array([8, 12, 16, 20])
+PIP = np.array([6, 10, 14, 18])
+MCP = np.array([5,  9, 13, 17])
+
+THUMB_TIP, MIDDLE_MCP, INDEX_TIP, WRIST = 4, 9, 8, 0
+
+THUMB_OPEN_DIST = 0.15   # thumb tip ↔ middle MCP, normalised units
+
+# mp.solutions.hands.HAND_CONNECTIONS, sorted — kept here so drawing a
+# skeleton does not need MediaPipe in the process
+HAND_CONNECTIONS = [(0, 1), (0, 5), (0, 17), (1, 2), (2, 3), (3, 4), (5, 6),
+                    (5, 9), (6, 7), (7, 8), (9, 10), (9, 13), (10, 11), (11, 12),
+                    (13, 14), (13, 17), (14, 15), (15, 16), (17, 18), (18, 19), (19, 20)]
+
+
+def to_array(lm, out=None):
+    """MediaPipe landmark list → (21, 3) float32 (written into out if given)."""
+    if out is None:
+        out = np.empty((N_LANDMARKS, 3), np.float32)
+    for i, p in enumerate(lm):
+        out[i, 0] = p.x
+        out[i, 1] = p.y
+        out[i, 2] = p.z
+    return out
+
+
+def thumb_distance(pts):
+    """Thumb tip ↔ middle-finger MCP in the image plane; (...) for (..., 21, 3)."""
+    d = pts[..., THUMB_TIP, :2] - pts[..., MIDDLE_MCP, :2]
+    return np.sqrt((d * d).sum(-1))
+
+
+def finger_states(pts, thumb_dist=THUMB_OPEN_DIST):
+    """
+    (..., 21, 3) → (..., 5) bool, ordered as FINGERS.
+
+    Thumb OPEN = tip (lm4) far from middle-finger MCP (lm9), which is
+    stable regardless of the other fingers. A finger is extended when
+    its tip is above both its pip and mcp joint.
+    """
+    y   = pts[..., 1]
+    tip = y[..., TIP]
+    ext = (tip < y[..., PIP]) & (tip < y[..., MCP])
+    thumb = thumb_distance(pts) > thumb_dist
+    return np.concatenate([thumb[..., None], ext], axis=-1)
+
+
+_BITS = 1 << np.arange(len(FINGERS))
+
+
+def pack(states):
+    """(..., 5) bool finger states → (...) 5-bit masks, bit i set when FINGERS[i] is up."""
+    return (states * _BITS).sum(-1).astype(np.uint8)
+
+
+def classify(stack, thumb_dist=THUMB_OPEN_DIST):
+    """(N, 21, 3) → (N,) 5-bit masks, bit i set when FINGERS[i] is up."""
+    return pack(finger_states(np.asarray(stack, np.float32), thumb_dist))
+
+
+def get_fingers(pts):
+    return dict(zip(FINGERS, finger_states(pts).tolist()))
+
+
+def mirror(pts):
+    """Flip x in place, (..., 21, 3) — landmarks as if the image had been mirrored."""
+    pts[..., 0] = 1.0 - pts[..., 0]
+    return pts
+
+
+def to_pixels(pts, w, h):
+    """(..., 21, 3) → (..., 21, 2) int32 pixel coordinates (truncated)."""
+    return (pts[..., :2] * np.array([w, h], np.float32)).astype(np.int32)
+
+
+def pinch_dist_px(pts, w, h):
+    """Thumb tip ↔ index tip distance in pixels; (...) for (..., 21, 3)."""
+    d = (pts[..., THUMB_TIP, :2] - pts[..., INDEX_TIP, :2]) * np.array([w, h], np.float32)
+    return np.sqrt((d * d).sum(-1))
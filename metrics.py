@@ -0,0 +1,244 @@
+"""
+Per-stage profiling and metrics export for Gesture Control.
+
+A Profiler times callables by wrapping them:
+
+    capture = profiler.wrap("capture", capture)
+
+Each wrapped call costs two perf_counter() reads and a deque append.
+When profiling is off nothing is wrapped at all, so the hot path is
+exactly the uninstrumented code.
+
+Per stage the profiler keeps a rolling window of durations (p50 / p95
+/ p99 / mean), a call rate and a running total. Counters (e.g. actions
+sent per kind) and collectors (callables returning stats dicts: input
+dispatcher, pipeline drops, inference) are read only when a snapshot
+is taken.
+
+Exports:
+    format_profile()  lines for the on-screen overlay
+    MetricsLog        periodic rows to a .csv or .jsonl file
+    MetricsServer     Prometheus text format on http://127.0.0.1:<port>/metrics
+"""
+import csv
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pipeline import LatencyMeter, RateMeter
+
+# ─────────────────────────────────────────────────────────────
+#  Profiler
+# ─────────────────────────────────────────────────────────────
+
+class StageTimer:
+    __slots__ = ("latency", "rate", "total")
+
+    def __init__(self, window):
+        self.latency = LatencyMeter(window)
+        self.rate    = RateMeter()
+        self.total   = 0.0
+
+    def add(self, seconds, now):
+        self.latency.add(seconds)
+        self.rate.tick(now)
+        self.total += seconds
+
+    def summary(self):
+        s = self.latency.summary()
+        s["fps"]     = self.rate.fps
+        s["count"]   = self.rate.count
+        s["total_s"] = self.total
+        return s
+
+
+class Profiler:
+    def __init__(self, window=600):
+        self.window     = window
+        self.stages     = {}          # name → StageTimer, in wrap order
+        self.counters   = Counter()
+        self.collectors = {}          # name → fn() → {key: number | dict}
+
+    def timer(self, name):
+        if name not in self.stages:
+            self.stages[name] = StageTimer(self.window)
+        return self.stages[name]
+
+    def wrap(self, name, fn, count=None):
+        """fn, timed under `name`; `count` also bumps that counter per call."""
+        st   = self.timer(name)
+        perf = time.perf_counter
+        counters = self.counters
+        if count is not None:
+            counters.setdefault(count, 0)     # present in every snapshot
+
+        def timed(*args, **kwargs):
+            t0 = perf()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                t1 = perf()
+                st.add(t1 - t0, t1)
+                if count is not None:
+                    counters[count] += 1
+        timed.__wrapped__ = fn
+        return timed
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def collect(self, name, fn):
+        self.collectors[name] = fn
+
+    def snapshot(self):
+        """{"t", "stages": {name: summary}, "counters": {...}, <collector>: {...}}"""
+        snap = {"t":        time.time(),
+                "stages":   {n: st.summary() for n, st in list(self.stages.items())},
+                "counters": dict(self.counters)}
+        for name, fn in list(self.collectors.items()):
+            try:
+                snap[name] = fn()
+            except Exception as e:       # a collector must never break export
+                snap[name] = {"error": str(e)}
+        return snap
+
+
+def flatten(d, prefix=""):
+    """Nested dict → {"a.b.c": number}, non-numeric leaves dropped."""
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(flatten(v, key + "."))
+        elif isinstance(v, bool):
+            out[key] = int(v)
+        elif isinstance(v, (int, float)):
+            out[key] = v
+    return out
+
+# ─────────────────────────────────────────────────────────────
+#  Overlay
+# ─────────────────────────────────────────────────────────────
+
+def format_profile(snap):
+    """One line per stage plus a counters line, for the preview overlay."""
+    lines = [f"{'stage':<10}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+    for name, s in snap["stages"].items():
+        lines.append(f"{name:<10}{s['p50_ms']:7.1f}{s['p95_ms']:7.1f}{s['p99_ms']:7.1f}")
+    if snap["counters"]:
+        lines.append("  ".join(f"{k}={v}" for k, v in sorted(snap["counters"].items())))
+    return lines
+
+# ─────────────────────────────────────────────────────────────
+#  Periodic log
+# ─────────────────────────────────────────────────────────────
+
+class MetricsLog:
+    """
+    Appends a flattened snapshot every `interval` seconds from a
+    background thread. PATH ending in .csv → CSV, anything else → one
+    JSON object per line.
+
+    CSV columns are fixed by the first row, so create the log after
+    every stage, counter and collector is registered, and keep
+    collector keys stable (counters created by wrap(count=…) start at 0).
+    """
+
+    def __init__(self, profiler, path, interval=1.0):
+        self.profiler = profiler
+        self.path     = path
+        self.interval = interval
+        self.csv      = path.lower().endswith(".csv")
+        self.rows     = 0
+        self._f       = open(path, "w", newline="")
+        self._writer  = None
+        self._stop    = threading.Event()
+        self._thread  = threading.Thread(target=self._run, name="metrics-log", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        row = flatten(self.profiler.snapshot())
+        if self.csv:
+            if self._writer is None:
+                self._writer = csv.DictWriter(self._f, fieldnames=list(row),
+                                              extrasaction="ignore")
+                self._writer.writeheader()
+            self._writer.writerow(row)
+        else:
+            self._f.write(json.dumps(row) + "\n")
+        self._f.flush()
+        self.rows += 1
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self.write()
+        self._f.close()
+
+# ─────────────────────────────────────────────────────────────
+#  Prometheus endpoint
+# ─────────────────────────────────────────────────────────────
+
+PREFIX = "gesture"
+QUANTILES = (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms"))
+
+
+def _metric_name(key):
+    return PREFIX + "_" + "".join(c if c.isalnum() else "_" for c in key)
+
+
+def prometheus_text(snap):
+    out = [f"# TYPE {PREFIX}_stage_seconds summary"]
+    for name, s in snap["stages"].items():
+        for q, key in QUANTILES:
+            out.append(f'{PREFIX}_stage_seconds{{stage="{name}",quantile="{q}"}} '
+                       f'{s[key] / 1000.0:.6f}')
+        out.append(f'{PREFIX}_stage_seconds_sum{{stage="{name}"}} {s["total_s"]:.6f}')
+        out.append(f'{PREFIX}_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+    out.append(f"# TYPE {PREFIX}_stage_rate gauge")
+    for name, s in snap["stages"].items():
+        out.append(f'{PREFIX}_stage_rate{{stage="{name}"}} {s["fps"]:.3f}')
+    out.append(f"# TYPE {PREFIX}_events_total counter")
+    for k, v in sorted(snap["counters"].items()):
+        out.append(f'{PREFIX}_events_total{{event="{k}"}} {v}')
+    rest = {k: v for k, v in snap.items() if k not in ("t", "stages", "counters")}
+    for key, v in flatten(rest).items():
+        out.append(f"{_metric_name(key)} {v}")
+    return "\n".join(out) + "\n"
+
+
+class MetricsServer:
+    """Serves prometheus_text(profiler.snapshot()) on GET /metrics."""
+
+    def __init__(self, profiler, port):
+        owner = self
+        self.profiler = profiler
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = prometheus_text(owner.profiler.snapshot()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
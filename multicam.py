@@ -0,0 +1,402 @@
+"""
+Multi-source, two-hand engine for Gesture Control.
+
+Every source (a camera index or a video file) is read and run through
+MediaPipe in a worker process: a multiprocessing pool whose initializer
+builds one MediaPipe Hands per worker, so N workers run N inferences in
+parallel on N cores. Workers publish their newest result per source to
+a ResultBoard in shared memory — landmarks only, never frames. The main
+process merges the board and feeds one HandTracker (tracker.py) per
+source and hand channel, so gesture state and OS input stay in one
+process.
+
+There is one OS cursor, so only one source moves it (--cursor-source,
+the first by default); the primary hand of every other source drives a
+cursor-less channel — gestures, scrolling and clicks, but no pointer
+motion — like the second hand below.
+
+Board slots are guarded by a sequence lock: the writer makes `seq` odd,
+writes, then makes it even again; a reader that sees an odd or changed
+seq reads again. Only the newest result per source is kept (latest
+wins, as in pipeline.py).
+
+Two-hand mode (--two-hands): MediaPipe looks for two hands per frame.
+The primary hand (--primary, right by default) drives channel 0 with
+the cursor; the other hand drives channel 1 — its own mode and gesture
+state, and optionally its own gesture table (--second-gestures) —
+without touching the cursor.
+
+    python multicam.py 0 1                          two cameras, one hand each
+    python multicam.py 0 1 --cursor-source 1        the second camera moves the cursor
+    python multicam.py 0 --two-hands                one camera, both hands
+    python multicam.py a.mp4 b.mp4 --bench 1 2 4    throughput with 1, 2, 4 workers
+
+Always headless; use virtualmouse.py for a preview.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import cv2
+import numpy as np
+
+import virtualmouse as vm
+from camera import Camera, RgbBuffer, is_camera
+from dispatcher import BACKENDS, InputDispatcher, RecordingBackend, make_input
+from landmarks import N_LANDMARKS, mirror
+from pipeline import LatencyMeter
+
+MAX_HANDS = 2
+
+# ─────────────────────────────────────────────────────────────
+#  Shared result board
+# ─────────────────────────────────────────────────────────────
+
+SLOT = np.dtype([("seq",     "u8"),
+                 ("frames",  "u8"),                   # frames inferred so far
+                 ("done",    "u1"),                   # source exhausted / closed
+                 ("t",       "f8"),                   # perf_counter at capture
+                 ("ts",      "f8"),                   # source time (video position / wall)
+                 ("w",       "u4"),
+                 ("h",       "u4"),
+                 ("n",       "u1"),                   # hands in this result
+                 ("channel", "u1", (MAX_HANDS,)),
+                 ("lm",      "f4", (MAX_HANDS, N_LANDMARKS, 3))])
+
+
+class ResultBoard:
+    """One SLOT per source in a SharedMemory block; name=None creates it."""
+
+    def __init__(self, n, name=None):
+        self.owner = name is None
+        self.shm   = SharedMemory(name=name, create=self.owner, size=SLOT.itemsize * n)
+        self.slots = np.ndarray((n,), SLOT, buffer=self.shm.buf)
+        if self.owner:
+            self.slots[:] = np.zeros(n, SLOT)
+        self.name  = self.shm.name
+
+    def write(self, i, t, ts, w, h, found):
+        """found: [(channel, pts)] — at most MAX_HANDS are kept."""
+        s = self.slots
+        s["seq"][i] += 1                       # odd: write in progress
+        s["t"][i], s["ts"][i] = t, ts
+        s["w"][i], s["h"][i]  = w, h
+        found = found[:MAX_HANDS]
+        for k, (ch, pts) in enumerate(found):
+            s["channel"][i, k] = ch
+            s["lm"][i, k]      = pts
+        s["n"][i]       = len(found)
+        s["frames"][i] += 1
+        s["seq"][i]    += 1
+
+    def finish(self, i):
+        s = self.slots
+        s["seq"][i]  += 1
+        s["done"][i]  = 1
+        s["seq"][i]  += 1
+
+    def read(self, i, last_seq):
+        """Copy of slot i if it changed since last_seq, else None."""
+        seq = self.slots["seq"]
+        while True:
+            s1 = int(seq[i])
+            if s1 == last_seq:
+                return None
+            if s1 & 1:
+                continue
+            rec = self.slots[i].copy()
+            if int(seq[i]) == s1:
+                return rec
+
+    def close(self):
+        del self.slots
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+# ─────────────────────────────────────────────────────────────
+#  Worker side
+# ─────────────────────────────────────────────────────────────
+
+_inference = None    # HandInference of this worker
+_stop      = None    # Event shared with the main process
+
+
+def _init_worker(stop, max_hands, crop, target_fps, flow):
+    """Pool initializer: one MediaPipe Hands per worker process (two with crop)."""
+    global _inference, _stop
+    from inference import HandInference
+    signal.signal(signal.SIGINT, signal.SIG_IGN)    # the main process handles Ctrl+C
+    _stop  = stop
+    hands  = vm.make_hands(max_hands)               # same settings as the live loop
+    _inference = HandInference(hands, crop=crop, target_fps=target_fps, flow=flow,
+                               crop_hands=vm.make_hands(max_hands) if crop else None)
+
+
+# MediaPipe labels handedness assuming a mirrored image; workers feed
+# it the camera image as is and mirror the landmarks instead
+_MIRRORED = {"Left": "Right", "Right": "Left"}
+
+
+def _run_source(i, source, board_name, n, two_hands, primary):
+    """Read source i to the end (or until stopped), publishing each result."""
+    board  = ResultBoard(n, board_name)
+    cap    = Camera(source)
+    to_rgb = RgbBuffer()
+    try:
+        if not cap.isOpened():
+            raise IOError(f"cannot open source {source!r}")
+        while not _stop.is_set():
+            ok, frame = cap.read()
+            if not ok:
+                break
+            t   = cap.t_frame
+            ts  = time.time() if cap.live else cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            rgb = to_rgb(frame)
+            if two_hands:
+                found = [(0 if _MIRRORED[label] == primary else 1, mirror(pts))
+                         for label, pts in _inference.process_hands(rgb)]
+            else:
+                pts   = _inference.process(rgb)
+                found = [] if pts is None else [(0, mirror(pts))]
+            board.write(i, t, ts, frame.shape[1], frame.shape[0], found)
+            cap.release_frame(frame)
+    finally:
+        board.finish(i)
+        cap.release()
+        board.close()
+    return _inference.stats()
+
+# ─────────────────────────────────────────────────────────────
+#  Main side
+# ─────────────────────────────────────────────────────────────
+
+class MultiEngine:
+    """
+    sources      camera indices ("0") and/or video paths
+    channels     channels[i] = [tracker for hand channel 0, (channel 1)]
+    workers      pool size (default: one per source, at most one per core,
+                 but never fewer than the live cameras)
+    two_hands    look for two hands per frame, see module docstring
+
+    A source keeps its worker until it ends, so every live camera needs
+    a worker of its own; video files beyond the pool size wait for one.
+    """
+
+    def __init__(self, sources, channels, workers=None, two_hands=False,
+                 primary="Right", crop=False, target_fps=None, flow=False):
+        self.sources   = list(sources)
+        self.channels  = channels
+        live = sum(1 for s in self.sources if is_camera(s))
+        if workers is None:
+            workers = max(live, min(len(self.sources), os.cpu_count() or 1))
+        elif workers < live:
+            raise ValueError(f"{live} cameras need at least {live} workers, got {workers}")
+        self.workers   = workers
+        self.two_hands = two_hands
+        self.primary   = primary
+        # crop and flow follow one hand; two-hand mode always runs full frames
+        self.infer_kw  = dict(crop=crop and not two_hands, target_fps=target_fps,
+                              flow=flow and not two_hands)
+        self.latency   = LatencyMeter()
+        self.merged    = 0                    # board results handed to trackers
+        self.frames    = [0] * len(self.sources)
+        self.infer     = [None] * len(self.sources)
+        self.wall      = 0.0                  # pool start → last source done
+        self.busy      = 0.0                  # first result → last source done
+        self._t_first  = 0.0
+
+    def _dispatch(self, i, rec, clock):
+        n   = int(rec["n"])
+        # clock time of the capture, not of this merge (see vm.frame_clock)
+        now = float(rec["ts"]) if clock is None else \
+              clock() - (time.perf_counter() - float(rec["t"]))
+        size = (int(rec["w"]), int(rec["h"]))
+        for ch, tracker in enumerate(self.channels[i]):
+            pts = next((rec["lm"][k] for k in range(n) if rec["channel"][k] == ch), None)
+            tracker.update(None, pts, now, size=size, drawing=False)
+        self.latency.add(time.perf_counter() - float(rec["t"]))
+        if self.merged == 0:
+            self._t_first = time.perf_counter()
+        self.merged += 1
+
+    def run(self, stop, clock=None):
+        """Until every source ends or `stop` is set. clock=None: source time."""
+        n     = len(self.sources)
+        board = ResultBoard(n)
+        ctx   = multiprocessing.get_context("spawn")
+        quit_ = ctx.Event()
+        pool  = ctx.Pool(self.workers, initializer=_init_worker,
+                         initargs=(quit_, MAX_HANDS if self.two_hands else 1,
+                                   self.infer_kw["crop"], self.infer_kw["target_fps"],
+                                   self.infer_kw["flow"]))
+        t0 = time.perf_counter()
+        try:
+            jobs = [pool.apply_async(_run_source, (i, src, board.name, n,
+                                                  self.two_hands, self.primary))
+                    for i, src in enumerate(self.sources)]
+            pool.close()
+            last = [0] * n
+            while True:
+                got = False
+                for i in range(n):
+                    rec = board.read(i, last[i])
+                    if rec is None:
+                        continue
+                    last[i] = int(rec["seq"])
+                    frames  = int(rec["frames"])
+                    if frames != self.frames[i]:      # not just the finish() bump
+                        self.frames[i] = frames
+                        self._dispatch(i, rec, clock)
+                    got = True
+                if not got:
+                    if all(j.ready() for j in jobs):
+                        break
+                    if stop.is_set():
+                        quit_.set()
+                    time.sleep(0.001)
+            self.infer = [j.get() for j in jobs]     # re-raises worker errors
+            pool.join()
+        finally:
+            t1 = time.perf_counter()
+            self.wall = t1 - t0
+            self.busy = t1 - self._t_first if self.merged else 0.0
+            quit_.set()
+            pool.terminate()
+            board.close()
+
+    @property
+    def fps(self):
+        """Inferred frames per second, all sources together, once running
+        (worker start-up — spawning, importing MediaPipe — excluded)."""
+        return sum(self.frames) / self.busy if self.busy > 0 else 0.0
+
+    def stats(self):
+        return {"workers": self.workers, "frames": list(self.frames),
+                "merged": self.merged, "wall_s": self.wall, "busy_s": self.busy,
+                "fps": self.fps, "latency": self.latency.summary()}
+
+
+def make_channels(sources, inputs, two_hands=False, second_inputs=None,
+                  gestures=None, second_gestures=None, filter_name=vm.CURSOR_FILTER,
+                  cursor_source=0):
+    """
+    One tracker per source (primary hand), plus a cursor-less one for the
+    second hand. Only source `cursor_source` moves the cursor.
+    """
+    if not 0 <= cursor_source < len(sources):
+        raise ValueError(f"cursor source {cursor_source} out of range for {len(sources)} sources")
+    screen = inputs.size()
+    out = []
+    for i, _ in enumerate(sources):
+        chans = [vm.make_tracker(inputs, screen, gestures or vm.GESTURE_FILE, filter_name,
+                                 cursor=i == cursor_source)]
+        if two_hands:
+            chans.append(vm.make_tracker(second_inputs or inputs, screen,
+                                         second_gestures or gestures or vm.GESTURE_FILE,
+                                         filter_name, cursor=False))
+        out.append(chans)
+    return out
+
+# ─────────────────────────────────────────────────────────────
+#  Benchmark
+# ─────────────────────────────────────────────────────────────
+
+def bench(sources, worker_counts, two_hands=False, **infer_kw):
+    """Throughput on video files for each worker count, input sent nowhere."""
+    rows = []
+    for w in worker_counts:
+        prim, sec = RecordingBackend(), RecordingBackend()
+        eng = MultiEngine(sources, make_channels(sources, prim, two_hands, sec),
+                          workers=w, two_hands=two_hands, **infer_kw)
+        eng.run(threading.Event())
+        rows.append((w, eng, prim.calls, sec.calls))
+    base = rows[0][1].fps
+    print(f"{len(sources)} sources, {os.cpu_count()} cores")
+    print(f"  {'workers':>7}{'frames':>8}{'wall s':>8}{'busy s':>8}{'fps':>8}"
+          f"{'speedup':>9}{'merged':>8}")
+    for w, eng, prim, sec in rows:
+        print(f"  {w:>7}{sum(eng.frames):>8}{eng.wall:>8.2f}{eng.busy:>8.2f}{eng.fps:>8.1f}"
+              f"{eng.fps / base if base else 0.0:>8.2f}x{eng.merged:>8}")
+    w, eng, prim, sec = rows[-1]
+    print("  actions:", "  ".join(f"{k}={v}" for k, v in sorted(prim.items())) or "none")
+    if two_hands:
+        print("  second hand:", "  ".join(f"{k}={v}" for k, v in sorted(sec.items())) or "none")
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Gesture control from several cameras / videos.")
+    ap.add_argument("sources", nargs="+", help="camera index (0, 1, …) or video file")
+    ap.add_argument("--workers", type=int, metavar="N",
+                    help="inference processes (default: one per source, at most one per core; "
+                         "at least one per camera)")
+    ap.add_argument("--cursor-source", type=int, default=0, metavar="I",
+                    help="position in the source list of the one source that moves the cursor "
+                         "(default 0, the first); the others only send gestures")
+    ap.add_argument("--two-hands", action="store_true",
+                    help="track two hands; the second drives its own action channel")
+    ap.add_argument("--primary", choices=("left", "right"), default="right",
+                    help="hand that moves the cursor in --two-hands mode (default right)")
+    ap.add_argument("--second-gestures", metavar="PATH",
+                    help="gesture table for the second hand (default: same as the first)")
+    ap.add_argument("--gestures", metavar="PATH",
+                    help="gesture table to use instead of gestures.json")
+    ap.add_argument("--crop", action="store_true",
+                    help="run MediaPipe on a crop around the last seen hand (one hand only)")
+    ap.add_argument("--target-fps", type=float, metavar="FPS",
+                    help="scale the inference input to hold this many inferences/sec")
+    ap.add_argument("--flow", action="store_true",
+                    help="run MediaPipe every few frames, optical flow in between (one hand only)")
+    ap.add_argument("--input", choices=sorted(BACKENDS), default="pyautogui",
+                    help="OS input backend (null: send nothing)")
+    ap.add_argument("--bench", type=int, nargs="+", metavar="N",
+                    help="measure throughput on the (video) sources with N workers each")
+    args = ap.parse_args()
+    infer_kw = dict(crop=args.crop, target_fps=args.target_fps, flow=args.flow)
+
+    if args.bench:
+        bench(args.sources, args.bench, args.two_hands, **infer_kw)
+        return
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT,  lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    inputs = make_input(args.input)
+    try:
+        eng = MultiEngine(args.sources,
+                          make_channels(args.sources, inputs, args.two_hands,
+                                        gestures=args.gestures,
+                                        second_gestures=args.second_gestures,
+                                        cursor_source=args.cursor_source),
+                          workers=args.workers, two_hands=args.two_hands,
+                          primary=args.primary.capitalize(), **infer_kw)
+    except ValueError as e:
+        if isinstance(inputs, InputDispatcher):
+            inputs.close()
+        ap.error(str(e))
+    try:
+        eng.run(stop, clock=time.time)
+    finally:
+        if isinstance(inputs, InputDispatcher):
+            inputs.close()
+
+    s   = eng.stats()
+    lat = s["latency"]
+    print(f"[multicam] {s['workers']} workers  {sum(s['frames'])} frames in "
+          f"{s['busy_s']:.1f}s ({s['fps']:.1f} fps)  merged {s['merged']}")
+    print(f"[multicam] capture->action latency: p50 {lat['p50_ms']:.1f} ms  "
+          f"p95 {lat['p95_ms']:.1f} ms")
+    if isinstance(inputs, InputDispatcher):
+        d = inputs.stats()
+        print(f"[multicam] input: {d['issued']} issued  {d['coalesced']} coalesced  "
+              f"{d['dropped']} dropped  {d['sent']} sent  {d['errors']} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Staged frame pipeline for Gesture Control.
+
+capture → inference → action → render run concurrently, joined by
+single-slot "latest wins" buffers: a stage that falls behind never
+builds a queue, it simply skips to the newest item and the skipped one
+is counted as a drop (and handed to on_drop, e.g. to give its frame
+buffer back to the camera).
+"""
+import threading
+import time
+from collections import deque
+
+# ─────────────────────────────────────────────────────────────
+#  Latest-wins slot
+# ─────────────────────────────────────────────────────────────
+
+class LatestSlot:
+    """
+    Bounded buffer of size 1. put() overwrites, get() takes the newest.
+    on_drop(item) is called (on the putting thread) for every item
+    overwritten before anyone read it.
+    """
+
+    def __init__(self, on_drop=None):
+        self._cond    = threading.Condition()
+        self._item    = None
+        self._full    = False
+        self._closed  = False
+        self.on_drop  = on_drop
+        self.dropped  = 0     # items overwritten before anyone read them
+
+    def put(self, item):
+        with self._cond:
+            old = self._item if self._full else None
+            if self._full:
+                self.dropped += 1
+            self._item = item
+            self._full = True
+            self._cond.notify()
+        if old is not None and self.on_drop is not None:
+            self.on_drop(old)
+
+    def get(self, timeout=None):
+        """Newest item, or None on timeout / after close()."""
+        with self._cond:
+            if not self._full and not self._closed:
+                self._cond.wait(timeout)
+            if not self._full:
+                return None
+            item, self._item, self._full = self._item, None, False
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+# ─────────────────────────────────────────────────────────────
+#  Meters
+# ─────────────────────────────────────────────────────────────
+
+class RateMeter:
+    """Events per second over a sliding time window."""
+
+    def __init__(self, window=1.0):
+        self.window = window
+        self.count  = 0
+        self._ts    = deque()
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        self.count += 1
+        self._ts.append(now)
+        while self._ts and now - self._ts[0] > self.window:
+            self._ts.popleft()
+
+    @property
+    def fps(self):
+        if len(self._ts) < 2:
+            return 0.0
+        span = self._ts[-1] - self._ts[0]
+        return (len(self._ts) - 1) / span if span > 0 else 0.0
+
+
+class LatencyMeter:
+    """Rolling latency samples (seconds): capture→action, or one stage."""
+
+    def __init__(self, size=600):
+        self._samples = deque(maxlen=size)
+
+    def add(self, seconds):
+        self._samples.append(seconds)
+
+    def summary(self):
+        if not self._samples:
+            return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+        s = sorted(self._samples)
+        pick = lambda q: s[min(len(s) - 1, int(q * len(s)))] * 1000.0
+        return {"mean_ms": sum(s) / len(s) * 1000.0,
+                "p50_ms":  pick(0.50),
+                "p95_ms":  pick(0.95),
+                "p99_ms":  pick(0.99)}
+
+# ─────────────────────────────────────────────────────────────
+#  Stages
+# ─────────────────────────────────────────────────────────────
+
+class Stage(threading.Thread):
+    """
+    Runs fn in a loop on its own thread.
+    Source stage (inbox=None): fn() → item, None ends the stream.
+    Other stages: fn(item) → item for outbox, None forwards nothing.
+    """
+
+    def __init__(self, name, fn, inbox, outbox, stop):
+        super().__init__(name=name, daemon=True)
+        self.fn     = fn
+        self.inbox  = inbox
+        self.outbox = outbox
+        self.stop   = stop
+        self.meter  = RateMeter()
+        self.error  = None
+
+    def run(self):
+        try:
+            while not self.stop.is_set():
+                if self.inbox is None:
+                    out = self.fn()
+                    if out is None:
+                        break
+                else:
+                    item = self.inbox.get(timeout=0.1)
+                    if item is None:
+                        continue
+                    out = self.fn(item)
+                self.meter.tick()
+                if out is not None and self.outbox is not None:
+                    self.outbox.put(out)
+        except Exception as e:   # surfaced again by Pipeline.run()
+            self.error = e
+        finally:
+            self.stop.set()
+            if self.outbox is not None:
+                self.outbox.close()
+
+
+class Pipeline:
+    """
+    Chain of threaded stages plus a sink that runs on the calling
+    thread (cv2.imshow / waitKey must stay on the main thread).
+
+    stages:  [(name, fn), ...]   first one is the source
+    sink:    fn(item) → False to quit
+    stop:    Event to share with the caller (e.g. set from a signal handler)
+    on_drop: fn(item) for every item a stage or the sink never got to see
+    """
+
+    def __init__(self, stages, sink, sink_name="render", stop=None, on_drop=None):
+        self.stop  = stop if stop is not None else threading.Event()
+        self.slots = [LatestSlot(on_drop) for _ in stages]
+        self.stages = []
+        inbox = None
+        for (name, fn), outbox in zip(stages, self.slots):
+            self.stages.append(Stage(name, fn, inbox, outbox, self.stop))
+            inbox = outbox
+        self.sink       = sink
+        self.sink_name  = sink_name
+        self.sink_meter = RateMeter()
+
+    def stats(self):
+        """{stage: {"fps": ..., "dropped": ...}} — drops are counted at
+        the stage's input, i.e. items it never got to see."""
+        out, dropped = {}, 0
+        for st, slot in zip(self.stages, self.slots):
+            out[st.name] = {"fps": st.meter.fps, "dropped": dropped}
+            dropped = slot.dropped
+        out[self.sink_name] = {"fps": self.sink_meter.fps, "dropped": dropped}
+        return out
+
+    def run(self):
+        for st in self.stages:
+            st.start()
+        last = self.slots[-1]
+        try:
+            while not self.stop.is_set():
+                item = last.get(timeout=0.1)
+                if item is None:
+                    continue
+                self.sink_meter.tick()
+                if self.sink(item) is False:
+                    break
+        finally:
+            self.stop.set()
+            for slot in self.slots:
+                slot.close()
+            for st in self.stages:
+                st.join(timeout=1.0)
+        for st in self.stages:
+            if st.error is not None:
+                raise st.error
+
+
+def format_stats(stats):
+    return "  ".join(f"{name} {s['fps']:4.1f}fps/{s['dropped']}drop"
+                     for name, s in stats.items())
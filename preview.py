@@ -0,0 +1,214 @@
+"""
+Preview and status outputs for Gesture Control.
+
+The control loop asks want() before it draws anything on a frame, so a
+frame nobody will look at costs no drawing at all. want() only peeks
+at the rate limits; they are used up by show(), so a frame that is
+drawn but then dropped by the pipeline does not cost a slot:
+
+    WindowPreview   cv2.imshow, optionally capped to a lower frame rate
+    MjpegPreview    annotated JPEGs on http://127.0.0.1:<port>/, only
+                    rendered while a client is connected
+    Preview         combines any of the above (none = fully headless)
+
+StatusServer publishes mode, current action and FPS as one JSON line
+per update to every client of a localhost TCP port (`nc 127.0.0.1 PORT`).
+"""
+import json
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+
+class _RateGate:
+    """True at most `fps` times per second (always, if fps is falsy)."""
+
+    def __init__(self, fps=None):
+        self.period = 1.0 / fps if fps else 0.0
+        self.last   = 0.0
+
+    def ready(self):
+        """Would a call pass now? (does not use up the slot)"""
+        return time.monotonic() - self.last >= self.period
+
+    def __call__(self):
+        now = time.monotonic()
+        if now - self.last < self.period:
+            return False
+        self.last = now
+        return True
+
+# ─────────────────────────────────────────────────────────────
+#  Window
+# ─────────────────────────────────────────────────────────────
+
+class WindowPreview:
+    def __init__(self, title="Gesture Control", fps=None):
+        self.title = title
+        self.gate  = _RateGate(fps)
+
+    def want(self):
+        return self.gate.ready()
+
+    def show(self, frame):
+        """False when ESC is pressed in the window."""
+        if not self.gate():
+            return True            # another frame in flight was shown first
+        cv2.imshow(self.title, frame)
+        return cv2.waitKey(1) & 0xFF != 27
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+# ─────────────────────────────────────────────────────────────
+#  MJPEG over HTTP
+# ─────────────────────────────────────────────────────────────
+
+class MjpegPreview:
+    BOUNDARY = b"frame"
+
+    def __init__(self, port, fps=10, quality=70):
+        self.gate    = _RateGate(fps)
+        self.quality = quality
+        self.clients = 0
+        self._jpeg   = None
+        self._cond   = threading.Condition()
+        self._closed = False
+
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary="
+                                 + owner.BOUNDARY.decode())
+                self.end_headers()
+                with owner._cond:
+                    owner.clients += 1
+                try:
+                    owner._stream(self.wfile)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with owner._cond:
+                        owner.clients -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="mjpeg", daemon=True).start()
+
+    def _stream(self, out):
+        last = None
+        while True:
+            with self._cond:
+                while self._jpeg is last and not self._closed:
+                    self._cond.wait(1.0)
+                if self._closed:
+                    return
+                last = self._jpeg
+            out.write(b"--" + self.BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n"
+                      + f"Content-Length: {len(last)}\r\n\r\n".encode() + last + b"\r\n")
+
+    def want(self):
+        return self.clients > 0 and self.gate.ready()
+
+    def show(self, frame):
+        if not self.gate():
+            return True
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if ok:
+            with self._cond:
+                self._jpeg = buf.tobytes()
+                self._cond.notify_all()
+        return True
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+# ─────────────────────────────────────────────────────────────
+#  Combined
+# ─────────────────────────────────────────────────────────────
+
+class Preview:
+    """Any number of outputs; with none, nothing is ever drawn."""
+
+    def __init__(self, outputs=()):
+        self.outputs = list(outputs)
+
+    def want(self):
+        """Outputs that want the next frame (empty: do not draw it)."""
+        return [o for o in self.outputs if o.want()]
+
+    def show(self, frame, outputs):
+        """Show on the outputs want() returned for this frame; False to quit."""
+        return all([o.show(frame) is not False for o in outputs])
+
+    def close(self):
+        for o in self.outputs:
+            o.close()
+
+# ─────────────────────────────────────────────────────────────
+#  Status socket
+# ─────────────────────────────────────────────────────────────
+
+class _TcpServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads      = True
+
+
+class StatusServer:
+    """One JSON line per publish() to every connected TCP client."""
+
+    def __init__(self, port, rate=10):
+        self.gate     = _RateGate(rate)
+        self._clients = []
+        self._lock    = threading.Lock()
+        owner = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                self.request.settimeout(0.5)
+                with owner._lock:
+                    owner._clients.append(self.request)
+                # keep the connection open until the client goes away
+                while True:
+                    try:
+                        if not self.request.recv(64):
+                            break
+                    except socket.timeout:
+                        continue
+                    except OSError:
+                        break
+                with owner._lock:
+                    if self.request in owner._clients:
+                        owner._clients.remove(self.request)
+
+        self.server = _TcpServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self.server.serve_forever, name="status", daemon=True).start()
+
+    def publish(self, status):
+        if not self._clients or not self.gate():
+            return
+        line = (json.dumps(status) + "\n").encode()
+        with self._lock:
+            for c in list(self._clients):
+                try:
+                    c.sendall(line)
+                except OSError:
+                    self._clients.remove(c)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
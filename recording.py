@@ -0,0 +1,96 @@
+"""
+Landmark recordings: one fixed-size record per camera frame, stored as
+a plain .npy structured array so a recording can be memory-mapped and
+sliced without parsing.
+
+    t        float64   wall-clock timestamp (time.time())
+    present  uint8     1 if a hand was detected
+    w, h     uint16    camera frame size
+    lm       float32   (21, 3) normalised landmarks (zeros if absent)
+"""
+import numpy as np
+
+from landmarks import N_LANDMARKS
+
+RECORD_DTYPE = np.dtype([
+    ("t",       "<f8"),
+    ("present", "u1"),
+    ("w",       "<u2"),
+    ("h",       "<u2"),
+    ("lm",      "<f4", (N_LANDMARKS, 3)),
+])
+
+HEADER_SIZE = 256   # fixed, so the record count can be patched in place
+
+
+def _npy_header(n):
+    """NPY v1.0 header for n records, padded to exactly HEADER_SIZE bytes."""
+    d = {"descr": np.lib.format.dtype_to_descr(RECORD_DTYPE),
+         "fortran_order": False,
+         "shape": (n,)}
+    body = repr(d).encode("latin1")
+    pad  = HEADER_SIZE - 10 - len(body) - 1
+    return (b"\x93NUMPY\x01\x00" +
+            (HEADER_SIZE - 10).to_bytes(2, "little") +
+            body + b" " * pad + b"\n")
+
+
+class LandmarkRecorder:
+    """
+    Streams records to disk as they arrive. The header is rewritten on
+    every flush, so a crashed session still leaves a loadable file.
+    """
+
+    def __init__(self, path, flush_every=120):
+        self.path        = path
+        self.count       = 0
+        self.flush_every = flush_every
+        self._buf        = np.zeros(flush_every, RECORD_DTYPE)
+        self._n          = 0
+        self._fp         = open(path, "wb")
+        self.flush()                     # empty but loadable from the start
+
+    def add(self, t, frame_shape, lm=None):
+        """lm: (21, 3) landmark array, MediaPipe landmark list, or None for no hand."""
+        r = self._buf[self._n]
+        r["t"] = t
+        r["h"], r["w"] = frame_shape[:2]
+        if lm is None:
+            r["present"] = 0
+            r["lm"]      = 0.0
+        else:
+            r["present"] = 1
+            r["lm"] = lm if isinstance(lm, np.ndarray) else \
+                      [(p.x, p.y, p.z) for p in lm]
+        self._n += 1
+        if self._n == self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._n:
+            self._buf[:self._n].tofile(self._fp)
+            self.count += self._n
+            self._n = 0
+        self._fp.seek(0)
+        self._fp.write(_npy_header(self.count))
+        self._fp.seek(0, 2)
+        self._fp.flush()
+
+    def close(self):
+        if not self._fp.closed:
+            self.flush()
+            self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_recording(path, mmap=True):
+    """Recording as a structured array (memory-mapped by default)."""
+    rec = np.load(path, mmap_mode="r" if mmap else None)
+    if rec.dtype != RECORD_DTYPE:
+        raise ValueError(f"{path}: not a landmark recording (dtype {rec.dtype})")
+    return rec
@@ -0,0 +1,140 @@
+"""
+Offline driver for Gesture Control.
+
+Feeds a landmark recording (.npy, see recording.py) or a video file
+through the same act() / draw_hud() stages as the live loop — no
+window, no camera, and OS input sent to a RecordingBackend (called
+synchronously, so action counts are deterministic) so nothing on the
+desktop moves. Time comes from the recording, so cooldowns and holds
+behave as they did live even when replaying faster than real time.
+
+    python replay.py session.npy
+    python replay.py clip.mp4
+"""
+import sys
+import time
+from collections import Counter, defaultdict
+
+import cv2
+import numpy as np
+
+import virtualmouse as vm
+from dispatcher import RecordingBackend
+from inference import HandInference
+from recording import load_recording
+
+# ─────────────────────────────────────────────────────────────
+#  Sources
+# ─────────────────────────────────────────────────────────────
+
+def _recording_frames(path, timings, infer_stats, **_):
+    """(t, frame, pts) per record, on a reused blank canvas."""
+    canvas = None
+    for rec in load_recording(path):
+        shape = (int(rec["h"]), int(rec["w"]), 3)
+        if canvas is None or canvas.shape != shape:
+            canvas = np.zeros(shape, np.uint8)
+        else:
+            canvas.fill(0)
+        yield float(rec["t"]), canvas, (rec["lm"] if rec["present"] else None)
+
+
+def _video_frames(path, timings, infer_stats, crop=False, target_fps=None, flow=False):
+    """(t, frame, pts) per video frame, with real MediaPipe inference."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"cannot open video {path!r}")
+    saved = vm.inference
+    hands = vm.make_hands()
+    crop_hands = vm.make_hands() if crop else None
+    vm.inference = HandInference(hands, crop=crop, target_fps=target_fps, flow=flow,
+                                 crop_hands=crop_hands)
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            t = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            t0 = time.perf_counter()
+            _, frame, pts = vm.infer((t0, frame))
+            timings["infer"].append(time.perf_counter() - t0)
+            yield t, frame, pts
+    finally:
+        infer_stats.update(vm.inference.stats())
+        hands.close()
+        if crop_hands is not None:
+            crop_hands.close()
+        vm.inference = saved
+        cap.release()
+
+# ─────────────────────────────────────────────────────────────
+#  Driver
+# ─────────────────────────────────────────────────────────────
+
+class ReplayResult:
+    def __init__(self, source):
+        self.source  = source
+        self.frames  = 0
+        self.wall    = 0.0                 # seconds spent replaying
+        self.timings = defaultdict(list)   # stage → per-frame seconds
+        self.actions = Counter()
+        self.infer   = {}                  # HandInference.stats(), video only
+
+    @property
+    def fps(self):
+        return self.frames / self.wall if self.wall > 0 else 0.0
+
+
+def replay(source, realtime=False, crop=False, target_fps=None, flow=False):
+    """
+    Run one recording/video through the loop. realtime=True sleeps to
+    the recorded timestamps instead of running flat out; crop,
+    target_fps and flow configure inference for video sources (see
+    inference.py).
+    """
+    out   = ReplayResult(source)
+    null  = RecordingBackend()
+    saved = vm.inputs, vm.clock, vm.frame_clock, vm.tracker
+    now   = [0.0]
+    vm.inputs  = null
+    vm.clock   = lambda: now[0]
+    vm.frame_clock = lambda t_cap: now[0]
+    vm.tracker = vm.make_tracker(null, null.size())
+
+    frames = (_recording_frames if source.endswith(".npy") else _video_frames)
+    t_start = time.perf_counter()
+    t_first = None
+    try:
+        for t, frame, pts in frames(source, out.timings, out.infer,
+                                    crop=crop, target_fps=target_fps, flow=flow):
+            now[0] = t
+            if realtime:
+                t_first = t if t_first is None else t_first
+                lag = (t - t_first) - (time.perf_counter() - t_start)
+                if lag > 0:
+                    time.sleep(lag)
+            t0 = time.perf_counter()
+            _, frame, mode, flash_t, _, _ = vm.act((t0, frame, pts))
+            t1 = time.perf_counter()
+            h, w, _ = frame.shape
+            vm.draw_hud(frame, mode, w, h, flash_t)
+            t2 = time.perf_counter()
+            out.timings["act"].append(t1 - t0)
+            out.timings["hud"].append(t2 - t1)
+            out.timings["frame"].append(t2 - t0)
+            out.frames += 1
+    finally:
+        out.wall = time.perf_counter() - t_start
+        vm.inputs, vm.clock, vm.frame_clock, vm.tracker = saved
+    out.actions = null.calls
+    return out
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    for src in sys.argv[1:]:
+        r = replay(src)
+        print(f"{src}: {r.frames} frames in {r.wall:.2f}s ({r.fps:.1f} fps)")
+        for name, n in sorted(r.actions.items()):
+            print(f"  {name:<20} {n}")
@@ -0,0 +1,258 @@
+"""
+Background screenshot service for Gesture Control.
+
+The control loop only calls request(): it puts (time, cursor) on a
+small bounded queue and returns at once. A grab thread takes the
+screenshot — the whole desktop, or a box around the cursor — and hands
+the image to a pool of writers that encode it (cv2.imencode releases
+the GIL, so writers run in parallel) and write it to disk.
+
+Backpressure: at most `workers + 1` grabbed images wait for or are in
+encoding; beyond that the grab thread blocks, the request queue fills
+up, and request() returns False (counted as rejected) instead of
+stalling the loop or piling up full-screen images in memory.
+
+Files are named after the request time with millisecond resolution,
+screenshot_20260117-142501-123.png, and created with O_EXCL, so two
+shots in the same millisecond (or another process) never overwrite
+each other: the later one gets a -1, -2, … suffix.
+
+Grabbers, picked by make_grabber():
+    mss         fast X11/Windows/macOS capture, needs the mss package
+    pyautogui   portable fallback (PIL-based)
+lazy_grabber() picks one on the first grab, so without either package
+only taking a screenshot fails, not start-up.
+
+A file whose write fails is removed again, so no empty screenshot is
+left behind.
+"""
+import contextlib
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from pipeline import LatencyMeter
+
+# ─────────────────────────────────────────────────────────────
+#  Grabbers:  grab(box) → BGR image,  box = (left, top, w, h) or None
+# ─────────────────────────────────────────────────────────────
+
+def mss_grabber():
+    import mss
+    local = threading.local()          # mss handles are per thread
+
+    def grab(box):
+        if not hasattr(local, "sct"):
+            local.sct = mss.mss()
+        mon = local.sct.monitors[0] if box is None else \
+            {"left": box[0], "top": box[1], "width": box[2], "height": box[3]}
+        return cv2.cvtColor(np.asarray(local.sct.grab(mon)), cv2.COLOR_BGRA2BGR)
+    return grab
+
+
+def pyautogui_grabber():
+    import pyautogui
+
+    def grab(box):
+        img = pyautogui.screenshot(region=box)
+        return cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2BGR)
+    return grab
+
+
+GRABBERS = {"mss": mss_grabber, "pyautogui": pyautogui_grabber}
+
+
+def make_grabber(name="auto"):
+    """Named grabber, or with "auto" the first one whose package is installed."""
+    if name != "auto":
+        return GRABBERS[name]()
+    for make in GRABBERS.values():
+        try:
+            return make()
+        except ImportError:
+            continue
+    raise RuntimeError("no screenshot grabber available: pip install mss or pyautogui")
+
+
+def lazy_grabber(name="auto"):
+    """make_grabber(name), called on the first grab (on the grab thread)."""
+    grab = None
+
+    def lazy(box):
+        nonlocal grab
+        if grab is None:
+            grab = make_grabber(name)
+        return grab(box)
+    return lazy
+
+# ─────────────────────────────────────────────────────────────
+#  Names & formats
+# ─────────────────────────────────────────────────────────────
+
+FORMATS = {"png": "png", "jpg": "jpg", "jpeg": "jpg", "webp": "webp"}
+
+
+def screenshot_name(t, ext="png", prefix="screenshot"):
+    """prefix_YYYYmmdd-HHMMSS-mmm.ext for wall-clock time t."""
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(t))
+    return f"{prefix}_{stamp}-{int(t * 1000) % 1000:03d}.{ext}"
+
+
+def encode_params(ext, level=3, quality=90):
+    """cv2.imencode flags: PNG compression level 0–9, JPEG/WebP quality 1–100."""
+    if ext == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(level)]
+    if ext == "jpg":
+        return [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+    return [cv2.IMWRITE_WEBP_QUALITY, int(quality)]
+
+# ─────────────────────────────────────────────────────────────
+#  Service
+# ─────────────────────────────────────────────────────────────
+
+class ScreenshotService:
+    """
+    grab       grab(box) → BGR image (see make_grabber)
+    directory  where files go
+    fmt        png | jpg | webp
+    level      PNG compression level (0 = fastest, 9 = smallest)
+    quality    JPEG / WebP quality
+    region     (w, h): capture only this box centred on the cursor
+    screen     (w, h) of the desktop, to keep the region on screen
+    workers    encode/write threads
+    maxlen     requests that may wait for the grab thread
+    """
+
+    def __init__(self, grab, directory=".", fmt="png", level=3, quality=90,
+                 region=None, screen=(1920, 1080), workers=2, maxlen=4,
+                 prefix="screenshot"):
+        if fmt.lower() not in FORMATS:
+            raise ValueError(f"unknown screenshot format {fmt!r}")
+        self.grab      = grab
+        self.directory = directory
+        self.ext       = FORMATS[fmt.lower()]
+        self.params    = encode_params(self.ext, level, quality)
+        self.region    = region
+        self.screen    = screen
+        self.prefix    = prefix
+        self.requested = 0
+        self.rejected  = 0
+        self.saved     = 0
+        self.failed    = 0
+        self.grab_ms   = LatencyMeter(100)
+        self.write_ms  = LatencyMeter(100)    # encode + write
+        self.last_path = None
+        os.makedirs(directory, exist_ok=True)
+        self._requests = queue.Queue(maxlen)
+        self._slots    = threading.BoundedSemaphore(workers + 1)
+        self._pool     = ThreadPoolExecutor(workers, thread_name_prefix="screenshot")
+        self._thread   = threading.Thread(target=self._run, name="screenshot-grab", daemon=True)
+        self._thread.start()
+
+    # ── Loop side ────────────────────────────────────────────
+
+    def request(self, t=None, center=None):
+        """Queue a screenshot taken at wall time t; False when the queue is full."""
+        try:
+            self._requests.put_nowait((time.time() if t is None else t, center))
+        except queue.Full:
+            self.rejected += 1
+            return False
+        self.requested += 1
+        return True
+
+    # ── Grab thread ──────────────────────────────────────────
+
+    def box(self, center):
+        """Region around center clamped to the screen, or None for the whole desktop."""
+        if self.region is None or center is None:
+            return None
+        sw, sh = self.screen
+        w, h   = min(self.region[0], sw), min(self.region[1], sh)
+        left   = int(min(max(center[0] - w / 2, 0), sw - w))
+        top    = int(min(max(center[1] - h / 2, 0), sh - h))
+        return left, top, int(w), int(h)
+
+    def _run(self):
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+            t, center = item
+            self._slots.acquire()             # backpressure from the writers
+            try:
+                t0  = time.perf_counter()
+                img = self.grab(self.box(center))
+                self.grab_ms.add(time.perf_counter() - t0)
+            except Exception as e:
+                self._slots.release()
+                self._fail("grab", e)
+                continue
+            self._pool.submit(self._write, img, t)
+
+    # ── Writers ──────────────────────────────────────────────
+
+    def _reserve(self, t):
+        """Create a new file named after t, never an existing one → (path, fd)."""
+        base = screenshot_name(t, self.ext, self.prefix)[:-(len(self.ext) + 1)]
+        for n in itertools.count():
+            path = os.path.join(self.directory,
+                                f"{base}{'' if n == 0 else f'-{n}'}.{self.ext}")
+            try:
+                return path, os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                continue
+
+    def _write(self, img, t):
+        try:
+            t0 = time.perf_counter()
+            ok, buf = cv2.imencode("." + self.ext, img, self.params)
+            if not ok:
+                raise RuntimeError(f"could not encode .{self.ext}")
+            path, fd = self._reserve(t)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(buf.tobytes())
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(path)       # reserved but not written
+                raise
+            self.write_ms.add(time.perf_counter() - t0)
+            self.saved    += 1
+            self.last_path = path
+            print("Screenshot saved:", path)
+        except Exception as e:
+            self._fail("write", e)
+        finally:
+            self._slots.release()
+
+    def _fail(self, stage, e):
+        self.failed += 1
+        if self.failed == 1:
+            print(f"Screenshot {stage} failed: {e}")
+
+    def close(self, timeout=5.0):
+        """Finish what is queued, then stop."""
+        try:
+            self._requests.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._pool.shutdown(wait=True)
+
+    def stats(self):
+        return {"requested": self.requested, "rejected": self.rejected,
+                "saved": self.saved, "failed": self.failed,
+                "grab_ms": self.grab_ms.summary(), "write_ms": self.write_ms.summary()}
+
+
+def format_stats(s):
+    return (f"screenshots: {s['saved']} saved  {s['rejected']} rejected  "
+            f"{s['failed']} failed  grab p50 {s['grab_ms']['p50_ms']:.0f} ms  "
+            f"encode+write p50 {s['write_ms']['p50_ms']:.0f} ms")
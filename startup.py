@@ -0,0 +1,96 @@
+"""
+Start-up phases and their timing.
+
+Startup runs the slow, independent parts of start-up at the same time,
+one thread each — opening the camera, loading the input backend and
+querying the screen, importing MediaPipe and building (and warming up)
+its graph — and records when every phase started and how long it took.
+Most of that time is spent waiting on the camera driver or in native
+code that releases the GIL, so it overlaps even on a single core.
+
+Milestones in the loop (first frame, first landmarks, first cursor
+move) are added with mark(); only the first call for a name counts.
+report() is a flat dict of milliseconds since the process started
+(or since Startup was created), with -1 for expected milestones not
+reached yet. It suits a JSON line per run, so cold-start regressions
+show up when runs are compared.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class Startup:
+    """
+    t0     perf_counter() time counted as zero, e.g. taken before the
+           heavy imports; default: now
+    marks  milestones expected later; report() gives -1 for those not
+           reached yet, so its keys do not change while running
+    """
+
+    def __init__(self, t0=None, marks=()):
+        self.t0     = time.perf_counter() if t0 is None else t0
+        self.phases = {}     # name → (start, seconds), start relative to t0
+        self.marks  = {}     # name → seconds since t0
+        self.expect = tuple(marks)
+        self._lock  = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Time the body of a with block as phase `name`."""
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = (t - self.t0, time.perf_counter() - t)
+
+    def run(self, **jobs):
+        """
+        Run every job (a no-argument callable) on its own thread, timed
+        as a phase of the same name → {name: result}. All jobs finish
+        before the first error, if any, is raised.
+        """
+        def timed(name, fn):
+            with self.phase(name):
+                return fn()
+
+        with ThreadPoolExecutor(len(jobs), thread_name_prefix="startup") as pool:
+            futures = {name: pool.submit(timed, name, fn) for name, fn in jobs.items()}
+        return {name: f.result() for name, f in futures.items()}
+
+    def mark(self, name):
+        """Record a milestone, once."""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.t0
+
+    def report(self):
+        """{"<phase>_ms", "<phase>_at_ms", "<mark>_ms"}, milliseconds."""
+        out = {}
+        for name, (start, secs) in self.phases.items():
+            out[f"{name}_at_ms"] = round(start * 1000, 1)
+            out[f"{name}_ms"]    = round(secs * 1000, 1)
+        for name in self.expect:
+            out[f"{name}_ms"] = -1.0
+        for name, t in self.marks.items():
+            out[f"{name}_ms"] = round(t * 1000, 1)
+        return out
+
+    def log(self, path, **extra):
+        """Append report() (and extra fields) to a JSON-lines file."""
+        with open(path, "a") as f:
+            f.write(json.dumps(dict(self.report(), t=time.time(), **extra)) + "\n")
+
+
+def format_report(s):
+    """startup: phases as start+duration, then the milestones, one line each."""
+    phases = sorted((k[:-6] for k in s if k.endswith("_at_ms")), key=lambda k: s[k + "_at_ms"])
+    marks  = sorted((k for k in s if k.endswith("_ms") and not k.endswith("_at_ms")
+                     and k[:-3] not in phases), key=lambda k: (s[k] < 0, s[k]))
+    lines  = [f"startup {name:<12s} at {s[name + '_at_ms']:7.0f} ms  took {s[name + '_ms']:6.0f} ms"
+              for name in phases]
+    lines += [f"startup {k[:-3]:<12s} at {s[k]:7.0f} ms" if s[k] >= 0 else
+              f"startup {k[:-3]:<12s} not reached" for k in marks]
+    return lines
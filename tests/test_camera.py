@@ -0,0 +1,69 @@
+"""Camera ring buffers: reused only once handed back with release_frame()."""
+import cv2
+import numpy as np
+import pytest
+
+from camera import Camera, RgbBuffer
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(12):
+        out.write(np.full((48, 64, 3), i * 20, np.uint8))
+    out.release()
+    return path
+
+
+@pytest.fixture
+def cam(video):
+    c = Camera(video)
+    yield c
+    c.release()
+
+
+def test_released_buffer_is_reused(cam):
+    frames = []
+    for _ in range(6):
+        ok, frame = cam.read()
+        assert ok
+        frames.append(frame)
+        cam.release_frame(frame)
+    assert all(f is frames[0] for f in frames)
+    assert cam.allocs == 1 and len(cam.ring) == 1 and cam.stats()["held"] == 0
+
+
+def test_held_frame_is_never_overwritten(cam):
+    _, first = cam.read()
+    kept = first.copy()
+    for _ in range(4):
+        _, frame = cam.read()
+        assert frame is not first
+        cam.release_frame(frame)
+    assert np.array_equal(first, kept)
+    assert len(cam.ring) == 2                   # one held, one cycling
+
+
+def test_ring_grows_to_frames_in_flight_then_stays(cam):
+    in_flight = [cam.read()[1] for _ in range(3)]
+    assert len({id(f) for f in in_flight}) == 3
+    for _ in range(5):
+        cam.release_frame(in_flight.pop(0))
+        in_flight.append(cam.read()[1])
+    assert len(cam.ring) == 3 and cam.allocs == 3
+
+
+def test_release_ignores_foreign_arrays(cam):
+    _, frame = cam.read()
+    cam.release_frame(None)
+    cam.release_frame(frame.copy())
+    assert cam.stats()["held"] == 1
+
+
+def test_rgb_buffer_is_reused():
+    to_rgb = RgbBuffer()
+    a = to_rgb(np.zeros((4, 4, 3), np.uint8))
+    b = to_rgb(np.full((4, 4, 3), (1, 2, 3), np.uint8))
+    assert a is b and to_rgb.allocs == 1
+    assert tuple(b[0, 0]) == (3, 2, 1)
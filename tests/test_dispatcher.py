@@ -0,0 +1,71 @@
+"""InputDispatcher: move/scroll coalescing, barriers and order."""
+import threading
+
+from dispatcher import InputDispatcher, RecordingBackend
+
+
+class HeldBackend(RecordingBackend):
+    """Blocks on its first call until released, so intents pile up behind it."""
+
+    def __init__(self):
+        super().__init__(keep=True)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def _rec(self, key, *args):
+        if not self.started.is_set():
+            self.started.set()
+            self.release.wait(5.0)
+        super()._rec(key, *args)
+
+
+def dispatch(calls):
+    """Queue `calls` behind a held first intent → what the backend saw."""
+    backend = HeldBackend()
+    d = InputDispatcher(backend)
+    d.hotkey("first")
+    assert backend.started.wait(5.0)
+    for name, *args in calls:
+        getattr(d, name)(*args)
+    backend.release.set()
+    d.close()
+    return backend.log[1:], d.stats()
+
+
+def test_pending_moves_collapse_to_newest():
+    log, s = dispatch([("move", 1, 1), ("move", 2, 2), ("move", 3, 3)])
+    assert log == [("move", 3, 3)]
+    assert s["coalesced"] == 2
+
+
+def test_scrolls_sum_per_modifier_set():
+    log, _ = dispatch([("scroll", 5), ("scroll", 1, ("ctrl",)), ("scroll", 7),
+                       ("scroll", 2, ("ctrl",))])
+    assert log == [("scroll_up", 12), ("ctrl+scroll_up", 3)]
+
+
+def test_click_is_a_barrier():
+    log, _ = dispatch([("move", 1, 1), ("click",), ("move", 2, 2), ("move", 3, 3),
+                       ("scroll", 4), ("hotkey", "ctrl", "0"), ("scroll", 6)])
+    assert log == [("move", 1, 1), ("click:left",), ("move", 3, 3), ("scroll_up", 4),
+                   ("hotkey:ctrl+0",), ("scroll_up", 6)]
+
+
+def test_moves_and_scrolls_merge_across_each_other():
+    log, _ = dispatch([("move", 1, 1), ("scroll", 2), ("move", 5, 5), ("scroll", 3)])
+    assert log == [("move", 5, 5), ("scroll_up", 5)]
+
+
+def test_full_queue_drops_oldest_move_first():
+    backend = HeldBackend()
+    d = InputDispatcher(backend, maxlen=3)
+    d.hotkey("first")
+    assert backend.started.wait(5.0)
+    d.move(1, 1)
+    d.click()
+    d.hotkey("a")
+    d.hotkey("b")                       # full: the pending move goes
+    backend.release.set()
+    d.close()
+    assert backend.log[1:] == [("click:left",), ("hotkey:a",), ("hotkey:b",)]
+    assert d.stats()["dropped"] == 1
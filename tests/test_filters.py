@@ -0,0 +1,85 @@
+"""EmaFilter time-constant equivalence; evaluate() lag sign and jitter."""
+import math
+
+import numpy as np
+import pytest
+
+from filters import FILTERS, EmaFilter, evaluate, make_filter
+
+
+def step_response(filt, fps, seconds=0.6):
+    """Output `seconds` after a 0 → 100 px step (a whole number of frames)."""
+    filt(0.0, 0.0, 0.0)
+    x, n = 0.0, round(seconds * fps)
+    for i in range(1, n + 1):
+        x, _ = filt(i / fps, 100.0, 0.0)
+    return x
+
+
+def test_ema_default_tau_matches_old_divisor_at_30fps():
+    # the old cursor moved 1/SMOOTH = 1/4 of the remaining way per frame
+    f = EmaFilter()
+    f(0.0, 0.0, 0.0)
+    x, _ = f(1 / 30, 100.0, 0.0)
+    assert x == pytest.approx(25.0, abs=0.1)
+
+
+@pytest.mark.parametrize("fps", [15, 60, 120])
+def test_ema_step_response_is_frame_rate_independent(fps):
+    ref = step_response(EmaFilter(), 30)
+    assert step_response(EmaFilter(), fps) == pytest.approx(ref, abs=1e-6)
+    assert ref == pytest.approx(100 * (1 - math.exp(-0.6 / 0.116)), abs=1e-6)
+
+
+def test_reset_forgets_state():
+    f = EmaFilter()
+    f(0.0, 0.0, 0.0)
+    f.reset()
+    assert f(1.0, 50.0, 60.0) == (50.0, 60.0)
+
+
+class Shifted:
+    """Ideal filter that outputs the input path `shift` seconds late
+    (shift > 0) or early (shift < 0)."""
+
+    def __init__(self, path, shift):
+        self.path, self.shift = path, shift
+
+    def reset(self):
+        pass
+
+    def __call__(self, t, x, y):
+        return self.path(t - self.shift)
+
+
+def ramp_trace(fps=60):
+    """Still, a 1 s sweep at 600 px/s, still again."""
+    def path(t):
+        return 600.0 * min(max(t - 0.5, 0.0), 1.0), 300.0
+
+    t = np.arange(0, 2.0, 1 / fps)
+    return path, t, np.array([path(ti) for ti in t])
+
+
+@pytest.mark.parametrize("shift", [0.05, 0.0, -0.03])
+def test_evaluate_lag_sign(shift):
+    path, t, xy = ramp_trace()
+    s = evaluate(Shifted(path, shift), t, xy)
+    assert s["lag_ms"] == pytest.approx(shift * 1000, abs=4)
+
+
+def test_evaluate_ema_lags_and_steadies():
+    path, t, xy = ramp_trace()
+    rng = np.random.default_rng(1)
+    noisy = xy + rng.normal(0, 2.0, xy.shape)
+    s = evaluate(EmaFilter(), t, noisy)
+    assert s["lag_ms"] > 50                      # smoothing costs lag, never leads
+    assert s["jitter_px"] < s["raw_jitter"] / 2
+
+
+def test_every_filter_is_constructible_and_callable():
+    for name in FILTERS:
+        f = make_filter(name)
+        f(0.0, 10.0, 20.0)
+        x, y = f(1 / 30, 10.0, 20.0)
+        assert (x, y) == pytest.approx((10.0, 20.0), abs=1e-6)
@@ -0,0 +1,130 @@
+"""GestureEngine: debounce, once / hold / every rows, cooldown, mode switches;
+GestureTable validation."""
+import json
+
+import pytest
+
+from gestures import GestureEngine, GestureTable, parse_fingers
+
+CONFIG = {
+    "cooldown": 0.5,
+    "debounce": {"n": 3, "m": 4},
+    "switch": [{"fingers": "10001", "to": "B"},
+               {"fingers": "11111", "to": "A"}],
+    "modes": {
+        "A": [{"fingers": "01000", "action": "click"},
+              {"fingers": "00000", "action": "shot", "hold": 0.7},
+              {"fingers": "01100", "action": "repeat", "every": 0.1}],
+        "B": [{"fingers": "01000", "action": "other"}],
+    },
+}
+
+CLICK, FIST, REPEAT, NONE = (parse_fingers(p)[0] for p in ("01000", "00000", "01100", "00111"))
+TO_B, TO_A = parse_fingers("10001")[0], parse_fingers("11111")[0]
+DT = 1 / 30
+
+
+def run(engine, masks, t0=0.0, mode="A"):
+    """Feed masks one frame apart → [Step], with the mode switches applied."""
+    steps = []
+    for i, m in enumerate(masks):
+        s = engine.update(mode, m, t0 + i * DT)
+        mode = s.switch or mode
+        steps.append(s)
+    return steps
+
+
+@pytest.fixture
+def engine():
+    return GestureEngine(GestureTable(CONFIG))
+
+
+def fired(steps):
+    return [i for i, s in enumerate(steps) if s.fire]
+
+
+def test_debounce_needs_n_of_m(engine):
+    steps = run(engine, [CLICK, CLICK, CLICK])
+    assert [s.action is not None for s in steps] == [False, False, True]
+    assert fired(steps) == [2]
+
+
+def test_single_noisy_frame_neither_fires_nor_cancels(engine):
+    steps = run(engine, [NONE, CLICK, NONE, NONE])
+    assert not fired(steps)
+    engine = GestureEngine(engine.table)
+    steps = run(engine, [REPEAT] * 4 + [NONE] + [REPEAT] * 2)
+    assert all(s.action is not None and s.action["action"] == "repeat" for s in steps[2:])
+
+
+def test_once_row_fires_once_per_activation(engine):
+    steps = run(engine, [CLICK] * 20)
+    assert fired(steps) == [2]
+    # released, then shown again after the cooldown: fires again
+    steps = run(engine, [NONE] * 4 + [CLICK] * 4, t0=1.0)
+    assert fired(steps) == [6]
+
+
+def test_cooldown_blocks_quick_refire(engine):
+    run(engine, [CLICK] * 3)                              # fires at 2 * DT
+    steps = run(engine, [NONE] * 4 + [CLICK] * 4, t0=4 * DT)
+    assert not fired(steps)                               # still inside 0.5 s
+
+
+def test_hold_reports_progress_then_fires_once(engine):
+    steps = run(engine, [FIST] * 40)                      # 1.33 s
+    first = 2                                             # active from here
+    prog = [s.progress for s in steps[first:]]
+    assert prog[0] == 0.0 and all(0.0 <= p < 1.0 for p in prog[1:20] if p is not None)
+    assert len(fired(steps)) == 1
+    assert (fired(steps)[0] - first) * DT >= 0.7 - 1e-9
+
+
+def test_every_row_repeats_without_cooldown(engine):
+    run(engine, [CLICK] * 3)                              # starts the cooldown
+    steps = run(engine, [REPEAT] * 32, t0=3 * DT)         # active for ~1 s
+    times = [i * DT for i in fired(steps)]
+    assert times[0] < 0.5                                 # cooldown does not apply
+    assert len(times) >= 7                                # 3 frames fall just short of 0.1 s
+    assert all(b - a >= 0.1 - 1e-9 for a, b in zip(times, times[1:]))
+
+
+def test_mode_switch_fires_once_per_activation(engine):
+    steps = run(engine, [TO_B] * 30)
+    assert [s.switch for s in steps if s.switch] == ["B"]
+    assert all(s.switch_hint == "B" for s in steps)
+
+
+def test_switch_to_current_mode_does_nothing(engine):
+    steps = run(engine, [TO_A] * 10)
+    assert not any(s.switch for s in steps)
+
+
+def test_mode_switch_changes_action_table(engine):
+    steps = run(engine, [TO_B] * 4 + [CLICK] * 4)
+    assert steps[-1].action["action"] == "other"
+
+
+def test_unknown_mode_section_is_rejected():
+    with pytest.raises(ValueError, match="unknown mode 'B'"):
+        GestureTable(CONFIG, modes=["A"])
+    GestureTable(CONFIG, modes=["A", "B", "C"])           # unused modes are fine
+
+
+def test_switch_to_unknown_mode_is_rejected():
+    config = dict(CONFIG, switch=CONFIG["switch"] + [{"fingers": "11000", "to": "C"}])
+    with pytest.raises(ValueError, match="targets unknown mode"):
+        GestureTable(config, modes=["A", "B", "C"])
+
+
+def test_tracker_table_with_extra_mode_fails_on_load(tmp_path):
+    import virtualmouse as vm
+
+    with open(vm.GESTURE_FILE) as f:
+        config = json.load(f)
+    config["switch"].append({"fingers": "11000", "to": "DRAW"})
+    config["modes"]["DRAW"] = [{"fingers": "01000", "action": "left_click"}]
+    path = tmp_path / "g2.json"
+    path.write_text(json.dumps(config))
+    with pytest.raises(ValueError, match="unknown mode 'DRAW'"):
+        vm.make_tracker(None, gestures=str(path))
@@ -0,0 +1,91 @@
+"""HandInference crops: a graph of their own, reset when the box moves."""
+import numpy as np
+import pytest
+
+from inference import HandInference
+
+W, H = 640, 480
+
+
+class _Lm:
+    def __init__(self, x, y):
+        self.x, self.y, self.z = x, y, 0.0
+
+
+class _Result:
+    def __init__(self, pts):
+        self.multi_hand_landmarks = [type("Hand", (), {"landmark": pts})] if pts else None
+        self.multi_handedness     = None
+
+
+class FakeHands:
+    """Finds the bright square in whatever image it is given; logs calls."""
+
+    def __init__(self):
+        self.log = []
+
+    def reset(self):
+        self.log.append("reset")
+
+    def process(self, img):
+        self.log.append(img.shape[:2])
+        ys, xs = np.nonzero(img[..., 0])
+        if not len(xs):
+            return _Result(None)
+        h, w = img.shape[:2]
+        corners = [(x, y) for x in (xs.min(), xs.max()) for y in (ys.min(), ys.max())]
+        return _Result([_Lm(*np.divide(corners[i % 4], (w, h))) for i in range(21)])
+
+
+def frame(cx, cy, r=30):
+    img = np.zeros((H, W, 3), np.uint8)
+    img[cy - r:cy + r, cx - r:cx + r] = 255
+    return img
+
+
+@pytest.fixture
+def inf():
+    return HandInference(FakeHands(), crop=True, crop_hands=FakeHands())
+
+
+def test_crop_needs_its_own_graph():
+    with pytest.raises(ValueError):
+        HandInference(FakeHands(), crop=True)
+
+
+def test_landmarks_come_back_in_full_frame_coordinates(inf):
+    for _ in range(3):
+        pts = inf.process(frame(200, 150))
+        assert pts[:, 0].min() == pytest.approx(170 / W, abs=2 / W)
+        assert pts[:, 1].max() == pytest.approx(179 / H, abs=2 / H)
+
+
+def test_full_frames_and_crops_use_different_graphs(inf):
+    for _ in range(5):
+        assert inf.process(frame(320, 240)) is not None
+    assert inf.hands.log == [(H, W)]                  # acquisition only
+    crops = inf.crop_hands.log
+    assert len(crops) == 4 and (H, W) not in crops
+    assert "reset" not in crops                       # a fresh graph needs none
+
+
+def test_crop_graph_is_reset_before_a_moved_box(inf):
+    path = [(320, 240)] * 3 + [(360, 240)] * 3 + [(400, 250)] * 3
+    for cx, cy in path:
+        inf.process(frame(cx, cy))
+    # each step re-centres the crop on the frame that sees it, and the
+    # next crop runs on a reset graph
+    assert inf.crop_hands.log == [(160, 160)] * 3 + ["reset"] + [(160, 160)] * 3 + \
+                                 ["reset"] + [(160, 160)] * 2
+    assert inf.crop_resets == 2 and inf.losses == 0
+
+
+def test_reacquisition_goes_back_to_the_full_frame_graph(inf):
+    inf.process(frame(320, 240))
+    inf.process(frame(320, 240))
+    assert inf.process(np.zeros((H, W, 3), np.uint8)) is None    # lost in the crop
+    assert inf.process(frame(100, 100)) is not None              # full frame finds it
+    inf.process(frame(100, 100))                                  # crop at the new box
+    assert inf.hands.log == [(H, W), (H, W)]
+    assert inf.crop_hands.log[-2] == "reset"
+    assert (inf.losses, inf.reacquired) == (1, 1)
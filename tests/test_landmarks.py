@@ -0,0 +1,59 @@
+"""classify / finger_states on (N, 21, 3) stacks against the per-frame rules."""
+import numpy as np
+import pytest
+
+from landmarks import FINGERS, THUMB_OPEN_DIST, classify, finger_states, get_fingers, pack
+
+
+class P:
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+
+def old_fingers(lm):
+    """The rules as written per frame on MediaPipe landmark objects."""
+    def is_extended(tip, pip, mcp):
+        return lm[tip].y < lm[pip].y and lm[tip].y < lm[mcp].y
+
+    dx, dy = lm[4].x - lm[9].x, lm[4].y - lm[9].y
+    return {"thumb":  (dx * dx + dy * dy) ** 0.5 > 0.15,
+            "index":  is_extended(8, 6, 5),
+            "middle": is_extended(12, 10, 9),
+            "ring":   is_extended(16, 14, 13),
+            "pinky":  is_extended(20, 18, 17)}
+
+
+@pytest.fixture
+def stack():
+    rng = np.random.default_rng(7)
+    pts = rng.random((2000, 21, 3), dtype=np.float32)
+    # keep away from the thumb threshold, where float32 and float64 may disagree
+    d = np.hypot(*(pts[:, 4, :2] - pts[:, 9, :2]).T)
+    return pts[np.abs(d - THUMB_OPEN_DIST) > 1e-4]
+
+
+def test_stack_matches_per_frame_rules(stack):
+    states = finger_states(stack)
+    assert states.shape == (len(stack), 5)
+    for pts, row in zip(stack, states):
+        old = old_fingers([P(*p) for p in pts])
+        assert dict(zip(FINGERS, row.tolist())) == old
+
+
+def test_classify_packs_one_bit_per_finger(stack):
+    masks = classify(stack)
+    assert masks.shape == (len(stack),) and masks.dtype == np.uint8
+    for pts, m in zip(stack[:200], masks[:200]):
+        old = old_fingers([P(*p) for p in pts])
+        assert m == sum(1 << i for i, f in enumerate(FINGERS) if old[f])
+
+
+def test_single_frame_and_stack_agree(stack):
+    assert np.array_equal(classify(stack[:1])[0], pack(finger_states(stack[0])))
+    assert get_fingers(stack[3]) == old_fingers([P(*p) for p in stack[3]])
+
+
+def test_thumb_threshold_is_tunable(stack):
+    loose, tight = classify(stack, thumb_dist=0.0), classify(stack, thumb_dist=2.0)
+    assert (loose & 1).all() and not (tight & 1).any()
+    assert np.array_equal(loose >> 1, tight >> 1)     # other fingers unaffected
@@ -0,0 +1,125 @@
+"""ResultBoard: seqlock write/read across attached boards."""
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from dispatcher import RecordingBackend
+from multicam import MAX_HANDS, SLOT, MultiEngine, ResultBoard, make_channels
+
+
+@pytest.fixture
+def board():
+    b = ResultBoard(2)
+    yield b
+    b.close()
+
+
+def hand(v):
+    return np.full((21, 3), v, np.float32)
+
+
+def test_read_sees_each_write_once(board):
+    seq = 0
+    assert board.read(0, seq) is None
+    board.write(0, 1.5, 0.25, 640, 480, [(0, hand(1))])
+    rec = board.read(0, seq)
+    assert rec is not None and rec["seq"] % 2 == 0
+    assert (rec["t"], rec["ts"], rec["w"], rec["h"], rec["n"]) == (1.5, 0.25, 640, 480, 1)
+    assert np.array_equal(rec["lm"][0], hand(1))
+    seq = int(rec["seq"])
+    assert board.read(0, seq) is None           # nothing new
+    assert board.read(1, 0) is None             # other slot untouched
+
+
+def test_attached_board_shares_the_slots(board):
+    other = ResultBoard(2, board.name)          # as a worker process attaches
+    try:
+        other.write(1, 2.0, 2.0, 320, 240, [(1, hand(7)), (0, hand(3))])
+        rec = board.read(1, 0)
+        assert rec["n"] == 2 and list(rec["channel"]) == [1, 0]
+        assert np.array_equal(rec["lm"][1], hand(3))
+        assert rec["frames"] == 1
+    finally:
+        other.close()
+    assert board.read(1, 0) is not None         # closing a reader keeps the block
+
+
+def test_extra_hands_are_dropped(board):
+    board.write(0, 0.0, 0.0, 1, 1, [(k % 2, hand(k)) for k in range(MAX_HANDS + 2)])
+    assert board.read(0, 0)["n"] == MAX_HANDS
+
+
+def test_finish_marks_done_and_bumps_seq(board):
+    board.write(0, 0.0, 0.0, 1, 1, [])
+    seq = int(board.read(0, 0)["seq"])
+    board.finish(0)
+    rec = board.read(0, seq)
+    assert rec["done"] == 1 and rec["seq"] == seq + 2
+
+
+def test_read_never_returns_a_torn_slot(board):
+    # the writer stamps t and every landmark with the same counter; a read
+    # that mixed two writes would see them disagree
+    def writer():
+        for k in range(1, 20001):
+            board.write(0, float(k), float(k), k, k, [(0, hand(k)), (1, hand(k))])
+
+    th = threading.Thread(target=writer)
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)                 # interleave the threads often
+    th.start()
+    try:
+        seq, seen = 0, 0
+        while th.is_alive() or seen == 0:
+            rec = board.read(0, seq)
+            if rec is None:
+                continue
+            seq, seen = int(rec["seq"]), seen + 1
+            assert seq % 2 == 0
+            assert (rec["lm"] == rec["t"]).all() and rec["w"] == rec["t"]
+    finally:
+        th.join()
+        sys.setswitchinterval(switch)
+    assert seen > 1
+
+
+def open_hand():
+    """All five fingers up, index tip in the middle of the frame."""
+    pts = np.zeros((21, 3), np.float32)
+    pts[:, 0] = 0.5
+    pts[:, 1] = 0.8                             # joints low in the frame
+    pts[[8, 12, 16, 20], 1] = 0.5               # fingertips above them
+    pts[4, :2] = 0.2, 0.6                       # thumb tip far from the middle MCP
+    return pts
+
+
+def cursor_moves(sources, fed, cursor_source):
+    """OS moves after 10 frames of an open hand on the sources in `fed`."""
+    inputs = RecordingBackend()
+    eng = MultiEngine(sources, make_channels(sources, inputs, cursor_source=cursor_source),
+                      workers=1)
+    rec = np.zeros(1, SLOT)[0]
+    rec["w"], rec["h"], rec["n"] = 640, 480, 1
+    rec["lm"][0] = open_hand()
+    for k in range(10):
+        rec["ts"] = k / 30
+        for i in fed:
+            eng._dispatch(i, rec, None)
+    return inputs.calls["move"]
+
+
+def test_only_the_cursor_source_moves_the_cursor():
+    sources = ["a.mp4", "b.mp4", "c.mp4"]
+    chans = make_channels(sources, RecordingBackend(), cursor_source=1)
+    assert [c[0].cursor for c in chans] == [False, True, False]
+    alone = cursor_moves(sources, [1], cursor_source=1)
+    assert alone > 0
+    assert cursor_moves(sources, [0, 1, 2], cursor_source=1) == alone
+    assert cursor_moves(sources, [0, 2], cursor_source=1) == 0
+
+
+def test_cursor_source_out_of_range():
+    with pytest.raises(ValueError):
+        make_channels(["0", "1"], RecordingBackend(), cursor_source=2)
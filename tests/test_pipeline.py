@@ -0,0 +1,72 @@
+"""LatestSlot drop counting and close; Pipeline drop accounting."""
+import threading
+
+from pipeline import LatestSlot, Pipeline
+
+
+def test_get_returns_newest_and_counts_overwrites():
+    slot = LatestSlot()
+    for i in range(5):
+        slot.put(i)
+    assert slot.get(timeout=0) == 4
+    assert slot.dropped == 4
+
+
+def test_get_empties_the_slot():
+    slot = LatestSlot()
+    slot.put("a")
+    assert slot.get(timeout=0) == "a"
+    assert slot.get(timeout=0) is None
+    slot.put("b")
+    assert slot.dropped == 0        # the slot was empty again
+
+
+def test_get_times_out_on_empty_slot():
+    assert LatestSlot().get(timeout=0.01) is None
+
+
+def test_close_wakes_a_blocked_reader():
+    slot, got = LatestSlot(), []
+    reader = threading.Thread(target=lambda: got.append(slot.get(timeout=5)))
+    reader.start()
+    slot.close()
+    reader.join(timeout=1)
+    assert not reader.is_alive()
+    assert got == [None]
+
+
+def test_item_put_before_close_is_still_delivered():
+    slot = LatestSlot()
+    slot.put("last")
+    slot.close()
+    assert slot.get(timeout=0) == "last"
+    assert slot.get(timeout=0) is None
+
+
+def test_pipeline_runs_every_item_to_the_sink_when_nothing_lags():
+    items, seen = iter(range(20)), []
+    gate = threading.Semaphore(0)
+
+    def source():
+        gate.acquire()              # one item in flight at a time
+        return next(items, None)
+
+    def sink(item):
+        seen.append(item)
+        gate.release()
+
+    gate.release()
+    pipe = Pipeline([("capture", source), ("double", lambda x: x * 2)], sink)
+    pipe.run()
+    assert seen == [2 * i for i in range(20)]
+    assert all(s["dropped"] == 0 for s in pipe.stats().values())
+
+
+def test_dropped_items_go_to_on_drop():
+    gone = []
+    slot = LatestSlot(on_drop=gone.append)
+    for i in range(4):
+        slot.put(i)
+    assert slot.get(timeout=0) == 3
+    slot.put(4)
+    assert gone == [0, 1, 2] and slot.dropped == 3
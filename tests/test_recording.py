@@ -0,0 +1,57 @@
+"""LandmarkRecorder → load_recording round trip."""
+import numpy as np
+import pytest
+
+from recording import RECORD_DTYPE, LandmarkRecorder, load_recording
+
+
+def hand(i):
+    return np.full((21, 3), i, np.float32)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "rec.npy"
+    with LandmarkRecorder(path, flush_every=4) as rec:
+        for i in range(10):
+            rec.add(100.0 + i, (480, 640, 3), hand(i) if i % 3 else None)
+    out = load_recording(path)
+    assert out.dtype == RECORD_DTYPE
+    assert len(out) == 10
+    assert np.array_equal(out["t"], 100.0 + np.arange(10))
+    assert list(out["present"]) == [0 if i % 3 == 0 else 1 for i in range(10)]
+    assert (out["w"] == 640).all() and (out["h"] == 480).all()
+    for i in range(10):
+        assert np.array_equal(out["lm"][i], hand(i) if i % 3 else np.zeros((21, 3)))
+
+
+def test_header_is_patched_after_each_flush(tmp_path):
+    # a session that dies without close() still loads up to the last flush
+    path = tmp_path / "rec.npy"
+    rec = LandmarkRecorder(path, flush_every=4)
+    assert len(load_recording(path, mmap=False)) == 0
+    for i in range(6):
+        rec.add(float(i), (240, 320), hand(i))
+    out = load_recording(path, mmap=False)
+    assert len(out) == 4                     # two records still buffered
+    assert np.array_equal(out["t"], np.arange(4.0))
+    rec.close()
+    assert len(load_recording(path, mmap=False)) == 6
+
+
+def test_mediapipe_landmark_lists_are_accepted(tmp_path):
+    class P:
+        def __init__(self, x, y, z):
+            self.x, self.y, self.z = x, y, z
+
+    path = tmp_path / "rec.npy"
+    with LandmarkRecorder(path) as rec:
+        rec.add(0.0, (480, 640), [P(i, 2 * i, 3 * i) for i in range(21)])
+    lm = load_recording(path)["lm"][0]
+    assert np.array_equal(lm[:, 1], 2 * np.arange(21))
+
+
+def test_other_arrays_are_rejected(tmp_path):
+    path = tmp_path / "other.npy"
+    np.save(path, np.zeros(3))
+    with pytest.raises(ValueError):
+        load_recording(path)
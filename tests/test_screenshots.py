@@ -0,0 +1,67 @@
+"""ScreenshotService: collision-free names, no file left by a failed write."""
+import os
+
+import numpy as np
+import pytest
+
+import screenshots
+from screenshots import ScreenshotService, screenshot_name
+
+T = 1_700_000_000.25
+
+
+@pytest.fixture
+def service(tmp_path):
+    s = ScreenshotService(lambda box: np.zeros((8, 8, 3), np.uint8), tmp_path)
+    yield s
+    s.close()
+
+
+def test_reserve_adds_suffixes_on_collision(service, tmp_path):
+    name = screenshot_name(T)
+    assert name.endswith("-250.png")
+    paths = []
+    for _ in range(3):
+        path, fd = service._reserve(T)
+        os.close(fd)
+        paths.append(os.path.basename(path))
+    base = name[:-4]
+    assert paths == [name, f"{base}-1.png", f"{base}-2.png"]
+
+
+def test_reserve_never_reuses_an_existing_file(service, tmp_path):
+    (tmp_path / screenshot_name(T)).write_bytes(b"keep")
+    path, fd = service._reserve(T)
+    os.close(fd)
+    assert path.endswith("-1.png")
+    assert (tmp_path / screenshot_name(T)).read_bytes() == b"keep"
+
+
+def test_request_saves_one_file(service, tmp_path):
+    assert service.request(T)
+    service.close()
+    assert service.saved == 1 and service.failed == 0
+    assert os.listdir(tmp_path) == [screenshot_name(T)]
+
+
+def test_failed_write_removes_the_reserved_file(service, tmp_path, monkeypatch):
+    real_fdopen = os.fdopen
+
+    class Full:
+        def __init__(self, fd, mode):
+            self.f = real_fdopen(fd, mode)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.f.close()
+
+        def write(self, data):
+            raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(screenshots.os, "fdopen", Full)
+    service._slots.acquire()                # as the grab thread does
+    service._write(np.zeros((8, 8, 3), np.uint8), T)
+    assert service.failed == 1 and service.saved == 0
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,60 @@
+"""VelocityAxis: frame-rate independence, fractional carry-over, event rate."""
+import pytest
+
+from velocity import VelocityAxis
+
+
+def drive(axis, fps, seconds, d=0.0, sign=1):
+    """Update at a steady frame rate → list of ticks per frame."""
+    n = int(round(fps * seconds))
+    return [axis.update(i / fps, d, sign) for i in range(n + 1)]
+
+
+@pytest.mark.parametrize("d", [0.0, 0.1, 0.3])
+def test_distance_per_second_independent_of_fps(d):
+    totals = [sum(drive(VelocityAxis(600, 2400, 0.25), fps, 2.0, d)) for fps in (15, 30, 60)]
+    speed  = VelocityAxis(600, 2400, 0.25).curve(d)
+    for t in totals:
+        # whatever is not sent yet is less than one event period's worth
+        assert speed * 2.0 - speed / 30 - 1 <= t <= speed * 2.0
+
+
+def test_fractional_ticks_carry_over():
+    axis  = VelocityAxis(base=10, top=10, max_rate=100)
+    ticks = drive(axis, 60, 1.0)                          # 1/6 tick per frame
+    assert sum(ticks) == 10
+    assert set(ticks) <= {0, 1}
+
+
+def test_direction_and_truncation_toward_zero():
+    axis = VelocityAxis(base=10, top=10, max_rate=100)
+    assert sum(drive(axis, 60, 1.0, sign=-1)) == -10
+
+
+def test_events_are_batched_at_bounded_rate():
+    axis   = VelocityAxis(base=600, top=600, max_rate=30)
+    ticks  = drive(axis, 120, 1.0)
+    events = [t for t in ticks if t]
+    assert len(events) <= 30 / 0.75 + 1                   # see the jitter slack
+    assert sum(events) >= 600 - 600 / 30 - 1
+
+
+def test_acceleration_curve():
+    axis = VelocityAxis(base=10, top=40, travel=0.2, gamma=2.0, deadzone=0.02)
+    assert axis.curve(0.0) == axis.curve(0.02) == 10
+    assert 10 < axis.curve(0.1) < 25                      # slow start
+    assert axis.curve(0.2) == axis.curve(1.0) == 40
+
+
+def test_first_update_and_reset_send_nothing():
+    axis = VelocityAxis(base=600, top=600)
+    assert axis.update(0.0, 0.0) == 0
+    axis.update(0.01, 0.0)                                # 6 ticks pending
+    axis.reset()
+    assert axis.update(5.0, 0.0) == 0                     # no jump, no leftovers
+
+
+def test_stall_is_clamped():
+    axis = VelocityAxis(base=100, top=100, max_dt=0.2)
+    axis.update(0.0, 0.0)
+    assert axis.update(10.0, 0.0) == 20
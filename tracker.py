@@ -0,0 +1,314 @@
+"""
+Per-hand gesture tracker.
+
+A HandTracker holds everything that belongs to one hand of one user:
+current mode, cursor filter, gesture engine and scroll/zoom
+references. It turns that hand's landmarks into intents on its own
+`inputs` channel (any object with the dispatcher API, see
+dispatcher.py), and optionally draws feedback on the frame. The live
+loop runs one tracker; multicam.py runs one per camera and hand.
+
+Gesture actions are methods named by the "action" of a gestures.json
+row (see ACTIONS). Each is called on every frame its row is active;
+step.fire says whether to act on this frame, and step.progress reports
+a hold in progress.
+
+Scrolling and zooming are velocity-based (velocity.py): when a scroll
+or zoom row becomes active, the hand's height (scroll_ref_y) or the
+thumb–index pinch (pinch_ref_dist) is taken as the reference pose.
+The gesture picks the direction; moving further from the reference —
+up for scroll up, down for scroll down, any change of the pinch for
+zoom — speeds it up. Both references are dropped when the row ends.
+"""
+import cv2
+
+from filters import make_filter
+from gestures import GestureEngine
+from landmarks import (finger_states, pack, pinch_dist_px, to_pixels, HAND_CONNECTIONS,
+                       INDEX_TIP, MIDDLE_MCP, WRIST)
+from screenshots import screenshot_name
+from velocity import VelocityAxis
+
+
+def draw_skeleton(img, px, color):
+    """Hand skeleton from (21, 2) pixel coordinates, in the given colour."""
+    for a, b in HAND_CONNECTIONS:
+        cv2.line(img, tuple(px[a]), tuple(px[b]), color, 2)
+    for p in px:
+        cv2.circle(img, tuple(p), 3, color, 2)
+
+
+class HandTracker:
+    """
+    inputs         action channel (InputDispatcher, backend, RecordingBackend)
+    table          GestureTable
+    modes, colors  mode names (first is the start mode) and their BGR colours
+    roi            (left, right, top, bottom) frame fractions mapped to the screen
+    screen         (w, h) of the screen the cursor moves on
+    cursor         False: this hand never moves the cursor (second-hand channel)
+    shots          ScreenshotService; None: inputs.screenshot() (synchronous)
+    scroll, zoom   VelocityAxis for scroll and Ctrl+scroll zoom ticks
+    """
+
+    ACTIONS = {
+        "screenshot":   "on_screenshot",
+        "double_click": "on_double_click",
+        "left_click":   "on_left_click",
+        "right_click":  "on_right_click",
+        "scroll_stop":  "on_scroll_stop",
+        "scroll_up":    "on_scroll_up",
+        "scroll_down":  "on_scroll_down",
+        "scroll_help":  "on_scroll_help",
+        "zoom_reset":   "on_zoom_reset",
+        "zoom_in":      "on_zoom_in",
+        "zoom_out":     "on_zoom_out",
+        "zoom_help":    "on_zoom_help",
+    }
+
+    def __init__(self, inputs, table, modes, colors, roi, screen=(1920, 1080),
+                 cursor_filter="euro", filter_params=None, cursor=True, shots=None,
+                 scroll=None, zoom=None):
+        self.inputs  = inputs
+        self.table   = table
+        self.modes   = list(modes)
+        self.colors  = colors
+        self.roi     = roi
+        self.screen  = screen
+        self.cursor  = cursor
+        self.shots   = shots
+        self.scroll_axis = scroll or VelocityAxis()
+        self.zoom_axis   = zoom or VelocityAxis()
+        self.cursor_xy = None     # last filtered cursor position (screen px)
+        self.filter  = make_filter(cursor_filter, **(filter_params or {}))
+        self.drawing = True
+        self.labels  = []         # feedback labels of the last update()
+        self.now     = 0.0
+        self.pts     = None       # landmarks and frame size of this update()
+        self.size    = None
+        self.reset()
+
+    def reset(self):
+        """Back to start-up state."""
+        self.mode_idx       = 0
+        self.filter.reset()
+        self.engine         = GestureEngine(self.table)
+        self.mode_flash_t   = -99.0
+        self.action         = None     # action of the active row
+        self.release()
+
+    def release(self):
+        """Drop the scroll/zoom reference poses (the gesture has ended)."""
+        self.scroll_ref_y   = None
+        self.pinch_ref_dist = None
+        self.scroll_axis.reset()
+        self.zoom_axis.reset()
+
+    @property
+    def mode(self):
+        return self.modes[self.mode_idx]
+
+    # ── Helpers ──────────────────────────────────────────────
+
+    def roi_box(self, w, h):
+        """ROI in frame pixels: rx1, rx2, ry1, ry2."""
+        l, r, t, b = self.roi
+        return int(w*l), int(w*r), int(h*t), int(h*b)
+
+    def cursor_target(self, pts, w, h, rx1, rx2, ry1, ry2):
+        """Map index fingertip inside ROI → screen position, kept sub-pixel."""
+        ix = float(pts[INDEX_TIP, 0]) * w
+        iy = float(pts[INDEX_TIP, 1]) * h
+        ix = max(rx1, min(ix, rx2))
+        iy = max(ry1, min(iy, ry2))
+        nx = (ix - rx1) / (rx2 - rx1)
+        ny = (iy - ry1) / (ry2 - ry1)
+        return nx * self.screen[0], ny * self.screen[1]
+
+    def move_cursor(self, pts, w, h, rx1, rx2, ry1, ry2, now):
+        """Fingertip → filtered screen position → OS cursor."""
+        x, y = self.filter(now, *self.cursor_target(pts, w, h, rx1, rx2, ry1, ry2))
+        self.cursor_xy = (x, y)
+        self.inputs.move(int(round(x)), int(round(y)))
+
+    def say(self, frame, txt, org, scale, color, thick):
+        """On-frame feedback label (drawn only when drawing this frame)."""
+        self.labels.append(txt)
+        if self.drawing:
+            cv2.putText(frame, txt, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thick)
+
+    def _scroll(self, sign):
+        """Velocity scroll in direction sign (+1 up) from the hand's height."""
+        y = float(self.pts[MIDDLE_MCP, 1])
+        if self.scroll_ref_y is None:
+            self.scroll_ref_y = y
+        ticks = self.scroll_axis.update(self.now, sign * (self.scroll_ref_y - y), sign)
+        if ticks:
+            self.inputs.scroll(ticks)
+
+    def _zoom(self, sign):
+        """Velocity zoom (Ctrl+scroll) in direction sign (+1 in) from the pinch."""
+        w, h = self.size
+        d = float(pinch_dist_px(self.pts, w, h)) / h
+        if self.pinch_ref_dist is None:
+            self.pinch_ref_dist = d
+        ticks = self.zoom_axis.update(self.now, abs(d - self.pinch_ref_dist), sign)
+        if ticks:
+            self.inputs.scroll(ticks, modifiers=('ctrl',))
+
+    def _tip_dot(self, frame, px, mc):
+        if self.drawing:
+            tip_x, tip_y = px[INDEX_TIP]
+            cv2.circle(frame, (tip_x, tip_y), 12, mc, -1)
+
+    # ── Per frame ────────────────────────────────────────────
+
+    def update(self, frame, pts, now, size=None, drawing=True):
+        """
+        One frame of this hand: pts is (21, 3) or None (hand not seen).
+        frame may be None when nothing is drawn; size (w, h) is then
+        the frame size the landmarks were measured on.
+        """
+        w, h = size if size is not None else (frame.shape[1], frame.shape[0])
+        self.drawing = drawing and frame is not None
+        self.labels.clear()
+        self.now  = now
+        self.pts  = pts
+        self.size = (w, h)
+
+        # ROI box
+        rx1, rx2, ry1, ry2 = self.roi_box(w, h)
+        mode = self.mode
+        mc   = self.colors[mode]
+        if self.drawing:
+            cv2.rectangle(frame, (rx1,ry1), (rx2,ry2), mc, 2)
+
+        if pts is None:
+            # No hand detected — reset all stateful tracking
+            self.action = None
+            self.release()
+            self.engine.reset()
+            self.say(frame, "No hand detected", (10, 42), 0.65, (60,60,75), 1)
+            return
+
+        px = to_pixels(pts, w, h).tolist()
+
+        # Draw skeleton in mode colour
+        if self.drawing:
+            draw_skeleton(frame, px, mc)
+
+        states = finger_states(pts)
+        thm_up = bool(states[0])   # True = open, False = closed/bent
+
+        # ══════════════════════════════════════════════════════
+        #  STEP 1 — CURSOR  (runs in ALL modes)
+        #  Thumb OPEN  → cursor follows index fingertip
+        #  Thumb CLOSED → cursor freezes
+        # ══════════════════════════════════════════════════════
+        if thm_up and self.cursor:
+            self.move_cursor(pts, w, h, rx1, rx2, ry1, ry2, now)
+            # Visual: glowing dot on index tip
+            if self.drawing:
+                tip_x, tip_y = px[INDEX_TIP]
+                cv2.circle(frame, (tip_x, tip_y), 14, mc, -1)
+                cv2.circle(frame, (tip_x, tip_y), 17, (255,255,255), 1)
+            self.say(frame, "MOVING", (10, 42), 0.75, mc, 2)
+        elif self.cursor:
+            self.say(frame, "STOPPED", (10, 42), 0.75, (80,80,95), 1)
+
+        # ══════════════════════════════════════════════════════
+        #  STEP 2 — GESTURES  (gestures.json via the engine)
+        #  Mode switches apply in every mode; the rest is looked
+        #  up in the (possibly just switched) mode's table.
+        # ══════════════════════════════════════════════════════
+        step = self.engine.update(mode, int(pack(states)), now)
+        if step.switch is not None:
+            self.mode_idx       = self.modes.index(step.switch)
+            self.mode_flash_t   = now
+
+        # A new row (or none) starts from a fresh reference pose
+        action = step.action["action"] if step.action is not None else None
+        if action != self.action:
+            self.action = action
+            self.release()
+
+        # Visual feedback for switch gestures
+        if step.switch_hint is not None:
+            self.say(frame, f"-> {step.switch_hint} MODE", (10, 78), 0.65,
+                     self.colors[step.switch_hint], 2)
+
+        if step.action is not None:
+            getattr(self, self.ACTIONS[step.action["action"]])(frame, px, mc, step)
+
+    # ── Gesture actions ──────────────────────────────────────
+
+    def on_screenshot(self, frame, px, mc, step):
+        if step.fire:
+            if self.shots is None:
+                save_path = screenshot_name(self.now)
+                self.inputs.screenshot(save_path)
+                print("Screenshot saved:", save_path)
+            elif not self.shots.request(self.now, self.cursor_xy):
+                # grab/encode still busy with earlier shots: nothing queued
+                self.say(frame, "SCREENSHOT BUSY", (10, 78), 0.8, (0, 0, 220), 2)
+                return
+            self.say(frame, "SCREENSHOT!", (10, 78), 0.8, (0, 0, 220), 2)
+        elif step.progress is not None:
+            # Draw hold progress arc on wrist area
+            if self.drawing:
+                wx, wy = px[WRIST]
+                cv2.ellipse(frame, (wx, wy), (28, 28), -90, 0,
+                            int(360 * step.progress), (0, 0, 220), 3)
+            self.say(frame, "Hold for screenshot...", (10, 78), 0.65, (0, 0, 220), 2)
+
+    def on_double_click(self, frame, px, mc, step):
+        if step.fire:
+            self.inputs.click(clicks=2)
+            self.say(frame, "DOUBLE CLICK", (10, 78), 0.8, (0,220,220), 2)
+
+    def on_left_click(self, frame, px, mc, step):
+        if step.fire:
+            self.inputs.click()
+            self.say(frame, "LEFT CLICK", (10, 78), 0.8, (50,220,50), 2)
+
+    def on_right_click(self, frame, px, mc, step):
+        if step.fire:
+            self.inputs.click('right')
+            self.say(frame, "RIGHT CLICK", (10, 78), 0.8, (220,220,50), 2)
+
+    def on_scroll_stop(self, frame, px, mc, step):
+        self.say(frame, "SCROLL STOPPED  (open palm)", (10, 112), 0.65, (80,80,95), 1)
+
+    def on_scroll_up(self, frame, px, mc, step):
+        if step.fire:
+            self._scroll(1)
+        self._tip_dot(frame, px, mc)
+        self.say(frame, "SCROLL UP  ↑", (10, 112), 0.75, mc, 2)
+
+    def on_scroll_down(self, frame, px, mc, step):
+        if step.fire:
+            self._scroll(-1)
+        self.say(frame, "SCROLL DOWN  ↓", (10, 112), 0.75, (0,170,255), 2)
+
+    def on_scroll_help(self, frame, px, mc, step):
+        self.say(frame, "Fist=scroll down  Index up=scroll up  Open=stop",
+                 (10, 112), 0.48, (80,80,95), 1)
+
+    def on_zoom_reset(self, frame, px, mc, step):
+        if step.fire:
+            self.inputs.hotkey('ctrl', '0')
+        self.say(frame, "ZOOM RESET (Ctrl+0)", (10, 112), 0.75, (255,200,0), 2)
+
+    def on_zoom_in(self, frame, px, mc, step):
+        if step.fire:
+            self._zoom(1)
+        self._tip_dot(frame, px, mc)
+        self.say(frame, "ZOOM IN  +", (10, 112), 0.8, mc, 2)
+
+    def on_zoom_out(self, frame, px, mc, step):
+        if step.fire:
+            self._zoom(-1)
+        self.say(frame, "ZOOM OUT  -", (10, 112), 0.8, (0,170,255), 2)
+
+    def on_zoom_help(self, frame, px, mc, step):
+        self.say(frame, "Index UP=zoom in  Fist=zoom out  All open=reset",
+                 (10, 112), 0.50, (80,80,95), 1)
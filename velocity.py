@@ -0,0 +1,79 @@
+"""
+Velocity scrolling and zooming.
+
+A VelocityAxis turns how far the hand has moved from a reference pose
+(the pose it was in when the gesture started) into a speed in ticks per
+second, and integrates that speed over real timestamps. The distance
+scrolled per second therefore depends on the gesture, not on the frame
+rate or on how busy the machine is:
+
+    speed = base + (top - base) * clip((d - deadzone) / (travel - deadzone), 0, 1) ** gamma
+
+base is the speed while the hand rests at the reference pose, top the
+speed at `travel` or more; gamma > 1 keeps small moves gentle and
+accelerates large ones. Displacements are in frame heights.
+
+Fractional ticks carry over from frame to frame. Whole ticks are sent
+at most `max_rate` times a second, so at high frame rates several
+frames' worth go out as one batched event instead of a stream of tiny
+ones.
+"""
+
+
+class VelocityAxis:
+    """
+    base      ticks/s at the reference pose
+    top       ticks/s at `travel` or more
+    travel    displacement (frame heights) that reaches top speed
+    gamma     acceleration curve exponent
+    deadzone  displacement ignored as hand tremor
+    max_rate  scroll events per second at most
+    max_dt    longest step integrated; a stall does not turn into a jump
+    """
+
+    def __init__(self, base=10.0, top=40.0, travel=0.2, gamma=2.0,
+                 deadzone=0.02, max_rate=30.0, max_dt=0.2):
+        self.base     = base
+        self.top      = top
+        self.travel   = travel
+        self.gamma    = gamma
+        self.deadzone = deadzone
+        self.period   = 1.0 / max_rate
+        self.max_dt   = max_dt
+        self.sent     = 0          # ticks emitted since construction
+        self.reset()
+
+    def reset(self):
+        """Gesture ended: forget the clock and any ticks not sent yet."""
+        self.t       = None
+        self.acc     = 0.0
+        self.speed   = 0.0
+        self._last   = None        # time of the last emitted event
+
+    def curve(self, d):
+        """Speed (ticks/s) for displacement d."""
+        x = (d - self.deadzone) / (self.travel - self.deadzone)
+        x = min(max(x, 0.0), 1.0)
+        return self.base + (self.top - self.base) * x ** self.gamma
+
+    def update(self, now, d, sign=1):
+        """
+        Integrate up to `now` with displacement d in direction sign (±1)
+        → whole ticks to send on this frame (0 most frames at high FPS).
+        """
+        self.speed = self.curve(d)
+        if self.t is None:
+            self.t = now
+            return 0
+        dt, self.t = min(max(now - self.t, 0.0), self.max_dt), now
+        self.acc += sign * self.speed * dt
+        # a quarter period of slack, so frame jitter at exactly max_rate
+        # FPS does not hold back every other frame
+        if self._last is not None and now - self._last < self.period * 0.75:
+            return 0
+        ticks = int(self.acc)          # toward zero; the rest carries over
+        if ticks:
+            self.acc  -= ticks
+            self._last = now
+            self.sent += abs(ticks)
+        return ticks
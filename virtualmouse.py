@@ -1,25 +1,77 @@
-import cv2
-import mediapipe as mp
-import pyautogui
 import time
+T_START = time.perf_counter()     # before the imports below, for the start-up report
+
+import argparse
+import cv2
+import signal
+import threading
 import numpy as np
 
-pyautogui.FAILSAFE = False
+from pipeline import Pipeline, RateMeter, LatencyMeter, format_stats
+from camera import Camera, RgbBuffer, format_stats as format_camera_stats
+from recording import LandmarkRecorder
+from landmarks import mirror
+from inference import HandInference, format_stats as format_infer_stats
+from dispatcher import BACKENDS, InputDispatcher, make_input
+from filters import FILTERS
+from hud import HudCompositor
+from gestures import GestureTable, DEFAULT_PATH as GESTURE_FILE
+from tracker import HandTracker
+from velocity import VelocityAxis
+from preview import Preview, WindowPreview, MjpegPreview, StatusServer
+from metrics import Profiler, MetricsLog, MetricsServer, format_profile
+from idle import IdleMode, format_stats as format_idle_stats
+from screenshots import FORMATS, GRABBERS, ScreenshotService, lazy_grabber, \
+    format_stats as format_shot_stats
+from startup import Startup, format_report as format_startup
 
 # ─────────────────────────────────────────────────────────────
 #  MediaPipe
+#  Imported on first use: it is the slowest import by far, and replays
+#  of recorded landmarks never need it.
 # ─────────────────────────────────────────────────────────────
-mp_hands = mp.solutions.hands
-mp_draw  = mp.solutions.drawing_utils
-hands    = mp_hands.Hands(max_num_hands=1,
-                          min_detection_confidence=0.8,
-                          min_tracking_confidence=0.7)
+hands    = None   # built in main()
+inference = None  # HandInference wrapping `hands`
+
+
+def make_hands(max_hands=1):
+    """MediaPipe Hands with this script's confidence thresholds."""
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(max_num_hands=max_hands,
+                                    min_detection_confidence=0.8,
+                                    min_tracking_confidence=0.7)
+
+
+def warm_up(hands, size=(640, 480), runs=2):
+    """
+    Push blank frames through the graph, so TFLite delegate set-up and
+    the first palm-detector run happen before the loop rather than on
+    the first camera frame. No hand is found, so no tracking state is
+    left behind.
+    """
+    blank = np.zeros((size[1], size[0], 3), np.uint8)
+    for _ in range(runs):
+        hands.process(blank)
 
 # ─────────────────────────────────────────────────────────────
 #  Screen & Camera
 # ─────────────────────────────────────────────────────────────
-cap = cv2.VideoCapture(0)
-screen_w, screen_h = pyautogui.size()
+cap = None        # Camera, opened in main()
+
+# OS input goes through `inputs` — an InputDispatcher when live, a bare
+# RecordingBackend when driven offline (see dispatcher.py). `clock` is
+# the time source for cooldowns and holds, so a replay can run faster
+# than real time. `frame_clock(t_cap)` is the clock() time a frame was
+# captured at (t_cap: perf_counter); the tracker's filters and scroll
+# integration run on it, so how late the act stage gets to a frame does
+# not turn into jitter. A replay's clock already is the recorded
+# capture time.
+inputs = None
+clock  = time.time
+
+
+def frame_clock(t_cap):
+    return clock() - (time.perf_counter() - t_cap)
 
 # ─────────────────────────────────────────────────────────────
 #  ROI — region of webcam mapped to full screen
@@ -31,7 +83,6 @@ ROI_T, ROI_B = 0.10, 0.80
 #  Modes  (DRAW removed)
 # ─────────────────────────────────────────────────────────────
 MODES = ["MOUSE", "SCROLL", "ZOOM"]
-mode_idx = 0
 
 MODE_COLOR = {
     "MOUSE":  (0,   210, 110),   # green
@@ -47,399 +98,460 @@ MODE_LABEL = {
 # ─────────────────────────────────────────────────────────────
 #  Tuning
 # ─────────────────────────────────────────────────────────────
-SMOOTH       = 4      # cursor smoothing (lower = faster)
-ACT_COOLDOWN = 0.50   # min seconds between clicks/actions
-SCROLL_SENS  = 600    # scroll speed
-ZOOM_SENS    = 8.0    # pinch pixels per zoom step
-ZOOM_COOL    = 0.06   # min seconds between zoom steps
-
-# ─────────────────────────────────────────────────────────────
-#  State
-# ─────────────────────────────────────────────────────────────
-prev_x = prev_y  = 0
-last_act         = 0.0
-last_zoom_t      = 0.0
-scroll_ref_y     = None
-pinch_ref_dist   = None
-mode_flash_t     = -99.0
-fist_hold_start  = None   # for screenshot hold gesture
-SCREENSHOT_HOLD  = 0.7   # seconds to hold fist for screenshot
+CURSOR_FILTER = "euro"  # none | ema | euro | kalman  (see filters.py)
+FILTER_PARAMS = {}      # e.g. {"min_cutoff": 1.0, "beta": 0.004}
+# Gesture → action table, cooldown, hold/repeat times and debouncing
+# live in gestures.json (see gestures.py); --gestures picks another file.
+# Scroll and zoom speeds in ticks per second, independent of the frame
+# rate (see velocity.py). Moving the hand away from where the gesture
+# started accelerates up to *_ACCEL × the resting speed.
+SCROLL_SENS   = 600    # scroll ticks/s with the hand held still
+SCROLL_ACCEL  = 4.0
+SCROLL_TRAVEL = 0.25   # hand travel (frame heights) for full speed
+ZOOM_SENS     = 50.0   # Ctrl+scroll ticks/s at the starting pinch (the old ±3 every 0.06 s)
+ZOOM_ACCEL    = 2.0
+ZOOM_TRAVEL   = 0.15   # pinch change (frame heights) for full speed
+EVENT_RATE    = 30     # scroll events/s at most; ticks in between are batched
 
 # ─────────────────────────────────────────────────────────────
-#  Gesture helpers
+#  Tracker
+#  Mode, cursor filter and gesture state of the hand live in a
+#  HandTracker (tracker.py); act() feeds it one frame at a time.
 # ─────────────────────────────────────────────────────────────
 
-def is_extended(lm, tip, pip, mcp):
-    """Finger extended = tip is above both pip and mcp joint."""
-    return lm[tip].y < lm[pip].y and lm[tip].y < lm[mcp].y
+def make_tracker(inputs, screen=(1920, 1080), gestures=GESTURE_FILE,
+                 filter_name=CURSOR_FILTER, cursor=True, shots=None):
+    """A HandTracker set up with the modes, ROI and tuning above."""
+    table = GestureTable.load(gestures, HandTracker.ACTIONS, MODES)
+    return HandTracker(inputs, table, MODES, MODE_COLOR,
+                       (ROI_L, ROI_R, ROI_T, ROI_B), screen, filter_name,
+                       FILTER_PARAMS if filter_name == CURSOR_FILTER else None,
+                       cursor=cursor, shots=shots,
+                       scroll=VelocityAxis(SCROLL_SENS, SCROLL_SENS * SCROLL_ACCEL,
+                                           SCROLL_TRAVEL, max_rate=EVENT_RATE),
+                       zoom=VelocityAxis(ZOOM_SENS, ZOOM_SENS * ZOOM_ACCEL,
+                                         ZOOM_TRAVEL, max_rate=EVENT_RATE))
 
 
-def thumb_open(lm):
-    """
-    Thumb OPEN = tip (lm4) far from middle-finger MCP (lm9).
-    This landmark pair is stable regardless of other finger positions.
-    """
-    dx = lm[4].x - lm[9].x
-    dy = lm[4].y - lm[9].y
-    return (dx*dx + dy*dy) ** 0.5 > 0.15
-
-
-def get_fingers(lm):
-    return {
-        "thumb":  thumb_open(lm),
-        "index":  is_extended(lm, 8,  6,  5),
-        "middle": is_extended(lm, 12, 10, 9),
-        "ring":   is_extended(lm, 16, 14, 13),
-        "pinky":  is_extended(lm, 20, 18, 17),
-    }
-
-
-def pinch_dist_px(lm, w, h):
-    x1, y1 = lm[4].x * w, lm[4].y * h
-    x2, y2 = lm[8].x * w, lm[8].y * h
-    return ((x2-x1)**2 + (y2-y1)**2) ** 0.5
-
-
-def move_cursor(lm, w, h, rx1, rx2, ry1, ry2):
-    """Map index fingertip inside ROI → screen position, apply smoothing."""
-    global prev_x, prev_y
-    ix = int(lm[8].x * w)
-    iy = int(lm[8].y * h)
-    ix = max(rx1, min(ix, rx2))
-    iy = max(ry1, min(iy, ry2))
-    nx = (ix - rx1) / (rx2 - rx1)
-    ny = (iy - ry1) / (ry2 - ry1)
-    tx = int(nx * screen_w)
-    ty = int(ny * screen_h)
-    prev_x = int(prev_x + (tx - prev_x) / SMOOTH)
-    prev_y = int(prev_y + (ty - prev_y) / SMOOTH)
-    pyautogui.moveTo(prev_x, prev_y)
+tracker = make_tracker(None)   # rebuilt in main() with the real inputs
 
 # ─────────────────────────────────────────────────────────────
 #  HUD helpers
 # ─────────────────────────────────────────────────────────────
 
-def rounded_rect(img, x1, y1, x2, y2, r, color, alpha=0.82):
-    ov = img.copy()
-    cv2.rectangle(ov, (x1+r, y1), (x2-r, y2), color, -1)
-    cv2.rectangle(ov, (x1, y1+r), (x2, y2-r), color, -1)
-    for cx, cy in [(x1+r,y1+r),(x2-r,y1+r),(x1+r,y2-r),(x2-r,y2-r)]:
-        cv2.circle(ov, (cx,cy), r, color, -1)
-    cv2.addWeighted(ov, alpha, img, 1-alpha, 0, img)
+hud = HudCompositor(MODES, MODE_COLOR, MODE_LABEL)
 
 
 def draw_hud(frame, mode, w, h, flash_t):
-    col = MODE_COLOR[mode]
-    now = time.time()
-
-    # ── Top-right mode badge ──────────────────────────────────
-    bw, bh = 340, 56
-    bx, by = w - bw - 14, 12
-    rounded_rect(frame, bx, by, bx+bw, by+bh, 12, (12,12,22), alpha=0.85)
-    cv2.rectangle(frame, (bx, by+8), (bx+5, by+bh-8), col, -1)
-    cv2.putText(frame, mode, (bx+16, by+24),
-                cv2.FONT_HERSHEY_DUPLEX, 0.78, col, 1, cv2.LINE_AA)
-    sub = MODE_LABEL[mode].split("-",1)[-1].strip()
-    cv2.putText(frame, sub, (bx+16, by+46),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.40, (160,160,175), 1, cv2.LINE_AA)
-
-
-    # ── Flash banner on mode switch ───────────────────────────
-    elapsed = now - flash_t
-    if elapsed < 1.0:
-        fade = max(0.0, 1.0 - elapsed)
-        ov   = frame.copy()
-        cv2.rectangle(ov, (0, h//2-36), (w, h//2+36), col, -1)
-        cv2.addWeighted(ov, fade*0.55, frame, 1-fade*0.55, 0, frame)
-        txt = f"  {mode} MODE  "
-        tsz = cv2.getTextSize(txt, cv2.FONT_HERSHEY_DUPLEX, 1.3, 2)[0]
-        cv2.putText(frame, txt, (w//2 - tsz[0]//2, h//2+16),
-                    cv2.FONT_HERSHEY_DUPLEX, 1.3, (255,255,255), 2, cv2.LINE_AA)
-
-    # ── Bottom legend ─────────────────────────────────────────
-    lx, ly = 14, h - 110
-    for m in MODES:
-        active = (m == mode)
-        bg = MODE_COLOR[m] if active else (32,32,42)
-        rounded_rect(frame, lx, ly, lx+220, ly+28, 5, bg, alpha=0.78)
-        tc = (255,255,255) if active else (120,120,135)
-        cv2.putText(frame, MODE_LABEL[m].split("-")[0].strip() +
-                    " - " + MODE_LABEL[m].split("-",1)[-1].strip()[:28],
-                    (lx+8, ly+18), cv2.FONT_HERSHEY_SIMPLEX,
-                    0.38, tc, 1, cv2.LINE_AA)
-        ly += 32
-
-    # ── Thumb hint (always visible) ───────────────────────────
-    hint = "Thumb OPEN=move  CLOSED=stop  |  Switch: Pinky=SCROLL  Thumb=MOUSE  Thumb+Index=ZOOM"
-    cv2.putText(frame, hint, (14, h-8),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.33, (100,100,118), 1, cv2.LINE_AA)
+    """Badge, flash banner, legend and hint, blended from cached tiles (hud.py)."""
+    hud.draw(frame, mode, flash_t, clock())
 
 
 # ─────────────────────────────────────────────────────────────
-#  Main loop
+#  Frame stages
+#  Shared by the serial loop and the pipelined one:
+#    capture() → (t_cap, frame)
+#    infer()   → (t_cap, frame, pts)     pts: (21, 3) array, mirrored, or None
+#    act()     → (t_cap, frame, mode, flash_t, drawn, outputs)   outputs: previews wanting it
+#    render()  → False to quit
+#  The frame is a camera ring buffer, always item[1]: render() hands it
+#  back with cap.release_frame(), and so does the pipeline for items it
+#  drops, after which the camera may decode into it again.
 # ─────────────────────────────────────────────────────────────
-while True:
+latency    = LatencyMeter()   # capture → actions dispatched
+loop_meter = RateMeter()      # control loop rate
+pipe       = None             # Pipeline, when --loop pipeline
+show_stats = False
+recorder   = None             # LandmarkRecorder, when --record
+preview    = None             # Preview; None draws every frame (replay/bench)
+status     = None             # StatusServer, when --status-port
+stop       = threading.Event()   # set by SIGINT/SIGTERM
+profiler   = None             # Profiler, when --profile / --metrics-*
+show_profile = False
+idle       = None             # IdleMode, when --idle-after
+to_rgb     = RgbBuffer()      # MediaPipe input, one buffer reused every frame
+shots      = None             # ScreenshotService, unless --input null
+startup    = None             # Startup phases and milestones, in main()
+
+
+def capture():
+    if idle is not None:
+        idle.apply(cap)
     ret, frame = cap.read()
     if not ret:
-        break
-
-    frame = cv2.flip(frame, 1)
-    h, w, _ = frame.shape
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-    # ROI box
-    rx1, rx2 = int(w*ROI_L), int(w*ROI_R)
-    ry1, ry2 = int(h*ROI_T), int(h*ROI_B)
-    mode = MODES[mode_idx]
-    mc   = MODE_COLOR[mode]
-    cv2.rectangle(frame, (rx1,ry1), (rx2,ry2), mc, 2)
-
-    result = hands.process(rgb)
-    now    = time.time()
-
-    if result.multi_hand_landmarks:
-        hl = result.multi_hand_landmarks[0]
-        lm = hl.landmark
-
-        # Draw skeleton in mode colour
-        spec = mp_draw.DrawingSpec(color=mc, thickness=2, circle_radius=3)
-        mp_draw.draw_landmarks(frame, hl, mp_hands.HAND_CONNECTIONS, spec, spec)
-
-        f       = get_fingers(lm)
-        thm_up  = f["thumb"]    # True = open, False = closed/bent
-        idx_up  = f["index"]
-        mid_up  = f["middle"]
-        rng_up  = f["ring"]
-        pnk_up  = f["pinky"]
-
-        # ══════════════════════════════════════════════════════
-        #  STEP 1 — CURSOR  (runs in ALL modes)
-        #  Thumb OPEN  → cursor follows index fingertip
-        #  Thumb CLOSED → cursor freezes
-        # ══════════════════════════════════════════════════════
-        if thm_up:
-            move_cursor(lm, w, h, rx1, rx2, ry1, ry2)
-            # Visual: glowing dot on index tip
-            tip_x = int(lm[8].x * w)
-            tip_y = int(lm[8].y * h)
-            cv2.circle(frame, (tip_x, tip_y), 14, mc, -1)
-            cv2.circle(frame, (tip_x, tip_y), 17, (255,255,255), 1)
-            cv2.putText(frame, "MOVING", (10, 42),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.75, mc, 2)
-        else:
-            cv2.putText(frame, "STOPPED", (10, 42),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.75, (80,80,95), 1)
-
-        # ══════════════════════════════════════════════════════
-        #  STEP 2 — MODE SWITCH  (instant, works from any mode)
-        #  All closed + only PINKY open  → MOUSE mode
-        #  All closed + only THUMB open  → SCROLL mode
-        #  All closed + THUMB + INDEX open → ZOOM mode
-        # ══════════════════════════════════════════════════════
-
-        # Base: index, middle, ring all closed
-        base_closed = not idx_up and not mid_up and not rng_up
-
-        to_mouse  = base_closed and pnk_up  and not thm_up  # pinky only
-        to_scroll = base_closed and thm_up  and not pnk_up  # thumb only
-        to_zoom   = base_closed and thm_up  and idx_up and not pnk_up  # thumb+index
-
-        # Re-check idx for zoom (it was used in base_closed above so override)
-        to_zoom   = not mid_up and not rng_up and not pnk_up and thm_up and idx_up
-        to_scroll = not idx_up and not mid_up and not rng_up and pnk_up and not thm_up  # pinky open → SCROLL
-        to_mouse  = not idx_up and not mid_up and not rng_up and not pnk_up and thm_up  # thumb open → MOUSE
-
-        switch_gesture = to_mouse or to_scroll or to_zoom
-
-        if switch_gesture and now - last_act > ACT_COOLDOWN:
-            new_mode = None
-            if to_zoom:
-                new_mode = "ZOOM"
-            elif to_mouse:
-                new_mode = "MOUSE"
-            elif to_scroll:
-                new_mode = "SCROLL"
-
-            if new_mode and new_mode != MODES[mode_idx]:
-                mode_idx       = MODES.index(new_mode)
-                mode_flash_t   = now
-                scroll_ref_y   = None
-                pinch_ref_dist = None
-                last_act       = now
-
-        # Visual feedback for switch gestures
-        if to_scroll:
-            cv2.putText(frame, "-> SCROLL MODE", (10, 78),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.65, MODE_COLOR["SCROLL"], 2)
-        elif to_mouse:
-            cv2.putText(frame, "-> MOUSE MODE", (10, 78),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.65, MODE_COLOR["MOUSE"], 2)
-        elif to_zoom:
-            cv2.putText(frame, "-> ZOOM MODE", (10, 78),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.65, MODE_COLOR["ZOOM"], 2)
-
-        pinky_only = to_scroll or to_mouse or to_zoom  # guard clicks during mode switch
-
-        # ══════════════════════════════════════════════════════
-        #  STEP 3 — CLICKS  (all modes, only when thumb CLOSED)
-        #  Index bend        → Left Click
-        #  Middle bend       → Right Click
-        #  Index+Middle bend → Double Click
-        # ══════════════════════════════════════════════════════
-        if mode == "MOUSE" and not thm_up and not pinky_only:
-
-            # ── Screenshot: full fist held for 0.7s ──────────
-            full_fist = not idx_up and not mid_up and not rng_up and not pnk_up
-
-            if full_fist:
-                if fist_hold_start is None:
-                    fist_hold_start = now
-                held = now - fist_hold_start
-                progress = min(held / SCREENSHOT_HOLD, 1.0)
-
-                # Draw hold progress arc on wrist area
-                wx = int(lm[0].x * w)
-                wy = int(lm[0].y * h)
-                cv2.ellipse(frame, (wx, wy), (28, 28), -90, 0,
-                            int(360 * progress), (0, 0, 220), 3)
-                cv2.putText(frame, f"Hold for screenshot...",
-                            (10, 78), cv2.FONT_HERSHEY_SIMPLEX,
-                            0.65, (0, 0, 220), 2)
-
-                if held >= SCREENSHOT_HOLD and now - last_act > ACT_COOLDOWN:
-                    save_path = f"screenshot_{int(now)}.png"
-                    pyautogui.screenshot(save_path)
-                    print("Screenshot saved:", save_path)
-                    cv2.putText(frame, "SCREENSHOT SAVED!", (10, 78),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 220), 2)
-                    last_act       = now
-                    fist_hold_start = None
+        return None
+    return cap.t_frame, frame
+
+
+def infer(item):
+    t_cap, frame = item
+    if idle is not None and idle.asleep:
+        # cheap motion gate instead of MediaPipe until something moves
+        if not idle.wake_check(frame, (ROI_L, ROI_R, ROI_T, ROI_B), t_cap):
+            return t_cap, frame, None
+        inference.reset()     # this frame is idle-sized, the next ones are not
+    # MediaPipe sees the camera image as it is and the landmarks are
+    # mirrored instead; act() only flips the pixels of frames it draws
+    pts = inference.process(to_rgb(frame))
+    if pts is not None:
+        mirror(pts)
+    if idle is not None:
+        idle.observe(pts is not None)
+        if idle.asleep:
+            inference.reset()
+    return t_cap, frame, pts
+
+
+def act(item):
+    """Gestures → mode switches, clicks and scroll/zoom, with on-frame feedback."""
+    t_cap, frame, pts = item
+    # decided once per frame: False when no preview wants the frame, so
+    # the tracker skips every cv2 drawing call (labels are still kept
+    # for the status socket). The outputs travel with the frame, since
+    # in the pipeline render() runs on another thread.
+    outputs = [] if preview is None else preview.want()
+    drawing = preview is None or bool(outputs)
+    now     = frame_clock(t_cap)
+    if drawing:
+        cv2.flip(frame, 1, dst=frame)     # selfie view, in place
+
+    if recorder is not None:
+        recorder.add(now, frame.shape, pts)
+
+    tracker.update(frame, pts, now, drawing=drawing)
+    if startup is not None and "first_move" not in startup.marks:
+        startup.mark("first_frame")
+        if pts is not None:
+            startup.mark("first_hand")
+        if tracker.cursor_xy is not None:
+            startup.mark("first_move")
+    if pts is None and idle is not None and idle.asleep:
+        tracker.say(frame, "IDLE - move a hand over the box to wake", (10, 78), 0.55, (60,60,75), 1)
+
+    latency.add(time.perf_counter() - t_cap)
+    if status is not None:
+        labels = tracker.labels
+        status.publish({"t": now, "mode": tracker.mode, "hand": pts is not None,
+                        "action": labels[-1] if labels else None,
+                        "labels": list(labels), "fps": round(loop_meter.fps, 1)})
+    return t_cap, frame, tracker.mode, tracker.mode_flash_t, drawing, outputs
+
+
+def render(item):
+    _, frame, mode, flash_t, drawn, outputs = item
+    loop_meter.tick()
+    shown = True
+    if drawn:
+        h, w, _ = frame.shape
+        draw_hud(frame, mode, w, h, flash_t)
+        if show_stats:
+            if pipe is not None:
+                txt = format_stats(pipe.stats())
             else:
-                fist_hold_start = None
-
-            # ── Clicks (only when NOT full fist) ─────────────
-            if not full_fist and now - last_act > ACT_COOLDOWN:
-
-                # Double click — index AND middle both bent
-                if not idx_up and not mid_up:
-                    pyautogui.doubleClick()
-                    cv2.putText(frame, "DOUBLE CLICK", (10, 78),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,220,220), 2)
-                    last_act = now
-
-                # Left click — only index bent, middle extended
-                elif not idx_up and mid_up:
-                    pyautogui.click()
-                    cv2.putText(frame, "LEFT CLICK", (10, 78),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (50,220,50), 2)
-                    last_act = now
-
-                # Right click — only middle bent, index extended
-                elif idx_up and not mid_up:
-                    pyautogui.click(button='right')
-                    cv2.putText(frame, "RIGHT CLICK", (10, 78),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (220,220,50), 2)
-                    last_act = now
-        else:
-            fist_hold_start = None
-
-        # ══════════════════════════════════════════════════════
-        #  STEP 4 — MODE-SPECIFIC ACTIONS
-        # ══════════════════════════════════════════════════════
-        mode = MODES[mode_idx]   # re-read in case it just changed
-
-        # ── SCROLL MODE ───────────────────────────────────────
-        #  All fingers OPEN          → stop scrolling
-        #  All fingers CLOSED (fist) → scroll DOWN continuously
-        #  All closed + index OPEN   → scroll UP continuously
-        if mode == "SCROLL":
-            all_open   = idx_up and mid_up and rng_up and pnk_up
-            all_closed = not idx_up and not mid_up and not rng_up and not pnk_up
-            scroll_up_gesture = idx_up and not mid_up and not rng_up and not pnk_up  # fist + index open
-
-            if all_open:
-                # All fingers open → stop
-                cv2.putText(frame, "SCROLL STOPPED  (open palm)", (10, 112),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.65, (80,80,95), 1)
-
-            elif scroll_up_gesture:
-                # Index open, rest closed → scroll UP
-                pyautogui.scroll(15)
-                tip_x = int(lm[8].x * w)
-                tip_y = int(lm[8].y * h)
-                cv2.circle(frame, (tip_x, tip_y), 12, mc, -1)
-                cv2.putText(frame, "SCROLL UP  ↑", (10, 112),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.75, mc, 2)
-
-            elif all_closed:
-                # Full fist → scroll DOWN
-                pyautogui.scroll(-15)
-                cv2.putText(frame, "SCROLL DOWN  ↓", (10, 112),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0,170,255), 2)
+                txt = f"serial {loop_meter.fps:4.1f}fps"
+            txt += "  " + format_infer_stats(inference.stats())
+            cv2.putText(frame, txt, (10, 16),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.38, (160,160,175), 1, cv2.LINE_AA)
+        if show_profile:
+            draw_profile(frame)
+        shown = preview.show(frame, outputs) is not False
+    cap.release_frame(frame)          # last stage: the camera may reuse the buffer
+    return shown and not stop.is_set()
+
+
+_profile_lines = []
+_profile_t     = 0.0
+
+
+def draw_profile(frame):
+    """Per-stage p50/p95/p99 under the mode badge, refreshed twice a second."""
+    global _profile_lines, _profile_t
+    now = time.perf_counter()
+    if now - _profile_t > 0.5:
+        _profile_t, _profile_lines = now, format_profile(profiler.snapshot())
+    x = frame.shape[1] - 300
+    for i, line in enumerate(_profile_lines):
+        cv2.putText(frame, line, (x, 92 + 15*i),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.38, (160,160,175), 1, cv2.LINE_AA)
+
+
+def instrument(prof):
+    """
+    Time every stage with `prof` by swapping in wrapped callables
+    (camera read, inference and MediaPipe, gestures, input backend
+    calls, HUD, preview). Without it nothing is wrapped at all.
+    """
+    global capture, infer, act, draw_hud
+    capture  = prof.wrap("capture", capture)
+    infer    = prof.wrap("infer", infer)
+    hands.process = prof.wrap("mediapipe", hands.process)
+    if inference.crop_hands is not None:
+        inference.crop_hands.process = prof.wrap("mediapipe", inference.crop_hands.process)
+    act      = prof.wrap("act", act)
+    backend  = getattr(inputs, "backend", inputs)
+    for kind in ("move", "click", "scroll", "hotkey", "screenshot"):
+        setattr(backend, kind, prof.wrap("input", getattr(backend, kind), count=kind))
+    draw_hud = prof.wrap("hud", draw_hud)
+    preview.show = prof.wrap("show", preview.show)
+
+    prof.collect("loop", lambda: {"fps": loop_meter.fps, "frames": loop_meter.count})
+    prof.collect("latency", latency.summary)
+    prof.collect("inference", inference.stats)
+    prof.collect("pipeline", lambda: pipe.stats() if pipe is not None else {})
+    if isinstance(inputs, InputDispatcher):
+        prof.collect("dispatch", inputs.stats)
+    if shots is not None:
+        prof.collect("screenshots", shots.stats)
+
+
+def camera_stats():
+    """Camera counters, with the RGB buffer counted among the allocations."""
+    s = cap.stats()
+    s["allocs"] += to_rgb.allocs
+    return s
 
-            else:
-                cv2.putText(frame, "Fist=scroll down  Index up=scroll up  Open=stop",
-                            (10, 112), cv2.FONT_HERSHEY_SIMPLEX,
-                            0.48, (80,80,95), 1)
-
-        # ── ZOOM MODE ─────────────────────────────────────────
-        #  Index finger UP   → Zoom IN  (Ctrl + scroll up)
-        #  Index finger DOWN → Zoom OUT (Ctrl + scroll down)
-        #  All fingers open  → Reset zoom (Ctrl+0)
-        elif mode == "ZOOM":
-            all_open_zoom = idx_up and mid_up and rng_up and pnk_up
-
-            if all_open_zoom:
-                # All open → reset zoom
-                if now - last_act > ACT_COOLDOWN:
-                    pyautogui.hotkey('ctrl', '0')
-                    last_act = now
-                    cv2.putText(frame, "ZOOM RESET (Ctrl+0)", (10, 112),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.75, (255,200,0), 2)
-                else:
-                    cv2.putText(frame, "ZOOM RESET (Ctrl+0)", (10, 112),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.75, (255,200,0), 2)
-
-            elif idx_up and not mid_up and not rng_up and not pnk_up:
-                # Only index UP → Zoom IN
-                if now - last_zoom_t > ZOOM_COOL:
-                    pyautogui.keyDown('ctrl')
-                    pyautogui.scroll(3)
-                    pyautogui.keyUp('ctrl')
-                    last_zoom_t = now
-                tip_x = int(lm[8].x * w)
-                tip_y = int(lm[8].y * h)
-                cv2.circle(frame, (tip_x, tip_y), 12, mc, -1)
-                cv2.putText(frame, "ZOOM IN  +", (10, 112),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, mc, 2)
-
-            elif not idx_up and not mid_up and not rng_up and not pnk_up:
-                # Full fist → Zoom OUT
-                if now - last_zoom_t > ZOOM_COOL:
-                    pyautogui.keyDown('ctrl')
-                    pyautogui.scroll(-3)
-                    pyautogui.keyUp('ctrl')
-                    last_zoom_t = now
-                cv2.putText(frame, "ZOOM OUT  -", (10, 112),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,170,255), 2)
+# ─────────────────────────────────────────────────────────────
+#  Main loop
+# ─────────────────────────────────────────────────────────────
 
-            else:
-                cv2.putText(frame, "Index UP=zoom in  Fist=zoom out  All open=reset",
-                            (10, 112), cv2.FONT_HERSHEY_SIMPLEX,
-                            0.50, (80,80,95), 1)
-
-    else:
-        # No hand detected — reset all stateful tracking
-        scroll_ref_y     = None
-        pinch_ref_dist   = None
-        fist_hold_start  = None
-        cv2.putText(frame, "No hand detected", (10, 42),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.65, (60,60,75), 1)
-
-    draw_hud(frame, MODES[mode_idx], w, h, mode_flash_t)
-    cv2.imshow("Gesture Control", frame)
-    if cv2.waitKey(1) & 0xFF == 27:
-        break
-
-cap.release()
-cv2.destroyAllWindows()
+def run_serial():
+    while not stop.is_set():
+        item = capture()
+        if item is None:
+            break
+        if render(act(infer(item))) is False:
+            break
+
+
+def make_pipeline():
+    """The stages as they are now (wrap them before building)."""
+    return Pipeline([("capture", capture),
+                     ("infer",   infer),
+                     ("act",     act)],
+                    sink=render, stop=stop, on_drop=release_item)
+
+
+def release_item(item):
+    """A dropped stage item: its frame buffer goes back to the camera."""
+    cap.release_frame(item[1])
+
+
+def _on_signal(signum, _frame):
+    stop.set()
+
+
+def _quit_after_first(sink):
+    """--startup-only: let one frame through render, then stop."""
+    def once(item):
+        sink(item)
+        stop.set()
+        return False
+    return once
+
+
+def main(argv=None):
+    global hands, inference, cap, inputs, tracker, shots, show_stats, recorder
+    global preview, status, profiler, show_profile, idle, startup, render, pipe
+    ap = argparse.ArgumentParser(description="Control the mouse with hand gestures.")
+    ap.add_argument("--loop", choices=("serial", "pipeline"), default="serial",
+                    help="serial: one stage after another (default); "
+                         "pipeline: capture/inference/action/render on separate threads")
+    ap.add_argument("--stats", action="store_true",
+                    help="draw loop FPS and per-stage drops on the preview")
+    ap.add_argument("--record", metavar="PATH",
+                    help="save per-frame hand landmarks to PATH (.npy) for replay.py / bench.py")
+    ap.add_argument("--crop", action="store_true",
+                    help="run MediaPipe on a crop around the last seen hand")
+    ap.add_argument("--target-fps", type=float, metavar="FPS",
+                    help="scale the inference input to hold this many inferences/sec")
+    ap.add_argument("--flow", action="store_true",
+                    help="run MediaPipe every few frames, optical flow in between")
+    ap.add_argument("--camera", default="0", metavar="INDEX|PATH",
+                    help="camera index or video file (default 0)")
+    ap.add_argument("--cam-size", metavar="WxH",
+                    help="capture size to request from the camera (default: driver's)")
+    ap.add_argument("--cam-fps", type=float, metavar="FPS",
+                    help="capture rate to request from the camera (default: driver's)")
+    ap.add_argument("--fourcc", default="MJPG", metavar="CODE",
+                    help="camera pixel format, e.g. MJPG (default) or YUYV; 'none' keeps the driver's")
+    ap.add_argument("--idle-after", type=float, metavar="SEC",
+                    help="after SEC without a hand, drop to a low-res, low-FPS motion watch")
+    ap.add_argument("--idle-size", default="320x240", metavar="WxH",
+                    help="capture size while idle (default 320x240)")
+    ap.add_argument("--idle-fps", type=float, default=10, metavar="FPS",
+                    help="capture rate while idle (default 10)")
+    ap.add_argument("--filter", choices=sorted(FILTERS), default=CURSOR_FILTER,
+                    help=f"cursor filter (default {CURSOR_FILTER})")
+    ap.add_argument("--gestures", metavar="PATH",
+                    help="gesture table to use instead of gestures.json")
+    ap.add_argument("--input", choices=sorted(BACKENDS), default="pyautogui",
+                    help="OS input backend (null: send nothing)")
+    ap.add_argument("--sync-input", action="store_true",
+                    help="call the input backend on the vision thread instead of a worker")
+    ap.add_argument("--shot-format", choices=sorted(FORMATS), default="png",
+                    help="screenshot file format (default png)")
+    ap.add_argument("--shot-level", type=int, default=3, metavar="0-9",
+                    help="PNG compression level, 0 fastest … 9 smallest (default 3)")
+    ap.add_argument("--shot-quality", type=int, default=90, metavar="1-100",
+                    help="JPEG/WebP screenshot quality (default 90)")
+    ap.add_argument("--shot-region", metavar="WxH",
+                    help="capture only a WxH box around the cursor instead of the desktop")
+    ap.add_argument("--shot-dir", default=".", metavar="DIR",
+                    help="directory for screenshots (default: current)")
+    ap.add_argument("--shot-workers", type=int, default=2, metavar="N",
+                    help="screenshot encode/write threads (default 2)")
+    ap.add_argument("--shot-grabber", choices=("auto",) + tuple(GRABBERS), default="auto",
+                    help="screen capture library (default: mss if installed, else pyautogui)")
+    ap.add_argument("--headless", action="store_true",
+                    help="no window and no drawing; quit with Ctrl+C / SIGTERM")
+    ap.add_argument("--preview-fps", type=float, metavar="FPS",
+                    help="refresh the preview window at most this often")
+    ap.add_argument("--mjpeg-port", type=int, metavar="PORT",
+                    help="serve the annotated preview as MJPEG on http://127.0.0.1:PORT/")
+    ap.add_argument("--mjpeg-fps", type=float, default=10, metavar="FPS",
+                    help="MJPEG frame rate (default 10)")
+    ap.add_argument("--status-port", type=int, metavar="PORT",
+                    help="publish mode/action/FPS as JSON lines on tcp://127.0.0.1:PORT")
+    ap.add_argument("--profile", action="store_true",
+                    help="time every stage; draw p50/p95/p99 on the preview")
+    ap.add_argument("--metrics-log", metavar="PATH",
+                    help="append stage timings and counters to PATH (.csv or .jsonl)")
+    ap.add_argument("--metrics-every", type=float, default=1.0, metavar="SEC",
+                    help="seconds between --metrics-log rows (default 1)")
+    ap.add_argument("--metrics-port", type=int, metavar="PORT",
+                    help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    ap.add_argument("--startup-log", metavar="PATH",
+                    help="append the start-up timing report to PATH as a JSON line")
+    ap.add_argument("--startup-only", action="store_true",
+                    help="quit once the first frame has been through the loop (times a cold start)")
+    args = ap.parse_args(argv)
+    show_stats = args.stats
+    startup    = Startup(T_START, marks=("imports", "ready", "first_frame",
+                                         "first_hand", "first_move"))
+    startup.mark("imports")
+    size = tuple(int(v) for v in args.cam_size.lower().split("x")) if args.cam_size else None
+
+    # Camera, input backend + screen, MediaPipe: independent and slow,
+    # so they start together (see startup.py)
+    def open_camera():
+        return Camera(args.camera, size=size, fps=args.cam_fps,
+                      fourcc=None if args.fourcc.lower() == "none" else args.fourcc)
+
+    def open_screen():
+        inputs = make_input(args.input, threaded=not args.sync_input)
+        screen = inputs.size()
+        shots  = None
+        if args.input != "null":
+            region = (tuple(int(v) for v in args.shot_region.lower().split("x"))
+                      if args.shot_region else None)
+            shots  = ScreenshotService(lazy_grabber(args.shot_grabber), args.shot_dir,
+                                       args.shot_format, args.shot_level, args.shot_quality,
+                                       region, screen, args.shot_workers)
+        return inputs, screen, shots
+
+    def load_hands():
+        hands = make_hands()
+        with startup.phase("warmup"):
+            warm_up(hands, size or (640, 480))
+        # crops get a graph of their own (see inference.py); it is reset
+        # before its first crop anyway, so it is not warmed up
+        return hands, (make_hands() if args.crop else None)
+
+    ready = startup.run(camera=open_camera, screen=open_screen, mediapipe=load_hands)
+    cap, (hands, crop_hands) = ready["camera"], ready["mediapipe"]
+    inputs, screen, shots = ready["screen"]
+
+    tracker = make_tracker(inputs, screen, args.gestures or GESTURE_FILE,
+                           args.filter, shots=shots)
+    if args.record:
+        recorder = LandmarkRecorder(args.record)
+
+    inference = HandInference(hands, crop=args.crop, target_fps=args.target_fps,
+                              flow=args.flow, crop_hands=crop_hands)
+
+    outputs = [] if args.headless else [WindowPreview(fps=args.preview_fps)]
+    if args.mjpeg_port:
+        outputs.append(MjpegPreview(args.mjpeg_port, fps=args.mjpeg_fps))
+    preview = Preview(outputs)
+    if args.status_port:
+        status = StatusServer(args.status_port)
+    signal.signal(signal.SIGINT,  _on_signal)
+    signal.signal(signal.SIGTERM, _on_signal)
+
+    if args.profile or args.metrics_log or args.metrics_port:
+        profiler = Profiler()
+        show_profile = args.profile
+        instrument(profiler)
+
+    if args.idle_after:
+        iw, ih = (int(v) for v in args.idle_size.lower().split("x"))
+        idle = IdleMode(args.idle_after, (iw, ih), args.idle_fps)
+        if profiler is not None:
+            profiler.collect("idle", idle.stats)
+
+    if args.startup_only:
+        render = _quit_after_first(render)
+    if args.loop == "pipeline":
+        pipe = make_pipeline()
+
+    # exporters last: a CSV log takes its columns from the first row, so
+    # every stage, counter and collector must be registered by now
+    metrics_log = metrics_server = None
+    if profiler is not None:
+        profiler.collect("camera", camera_stats)
+        profiler.collect("startup", startup.report)
+        if args.metrics_log:
+            metrics_log = MetricsLog(profiler, args.metrics_log, args.metrics_every)
+        if args.metrics_port:
+            metrics_server = MetricsServer(profiler, args.metrics_port)
+    startup.mark("ready")
+    try:
+        if pipe is not None:
+            pipe.run()
+        else:
+            run_serial()
+    finally:
+        cap.release()
+        preview.close()
+        if status is not None:
+            status.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        if isinstance(inputs, InputDispatcher):
+            inputs.close()
+        if shots is not None:
+            shots.close()
+        if recorder is not None:
+            recorder.close()
+            print(f"Recorded {recorder.count} frames to {args.record}")
+        if metrics_log is not None:
+            metrics_log.close()
+            print(f"Wrote {metrics_log.rows} metrics rows to {args.metrics_log}")
+
+    lat = latency.summary()
+    print(f"[{args.loop}] capture->action latency: mean {lat['mean_ms']:.1f} ms  "
+          f"p50 {lat['p50_ms']:.1f} ms  p95 {lat['p95_ms']:.1f} ms")
+    if pipe is not None:
+        print(f"[{args.loop}] {format_stats(pipe.stats())}")
+    print(f"[{args.loop}] {format_infer_stats(inference.stats())}  "
+          f"({inference.losses} lost in crop, {inference.reacquired} re-acquired)")
+    print(f"[{args.loop}] {format_camera_stats(camera_stats())}")
+    if isinstance(inputs, InputDispatcher):
+        s = inputs.stats()
+        print(f"[{args.loop}] input: {s['issued']} issued  {s['coalesced']} coalesced  "
+              f"{s['dropped']} dropped  {s['sent']} sent  {s['errors']} errors")
+    if shots is not None and shots.requested:
+        print(f"[{args.loop}] {format_shot_stats(shots.stats())}")
+    if idle is not None:
+        print(f"[{args.loop}] {format_idle_stats(idle.stats())}")
+    if profiler is not None:
+        for line in format_profile(profiler.snapshot()):
+            print(f"[{args.loop}] {line}")
+    for line in format_startup(startup.report()):
+        print(f"[{args.loop}] {line}")
+    if args.startup_log:
+        startup.log(args.startup_log, loop=args.loop, camera=args.camera)
+
+
+if __name__ == "__main__":
+    main()